@@ -1,7 +1,15 @@
+import functools
+import re
+
 from eformer.loggings import get_logger
 
 logger = get_logger("Decoders")
 
+# U+FFFD replacement character, or its literal escape sequence
+_MALFORMED_SEARCH = re.compile(r"\ufffd|\\ufffd").search
+# Prefixes decoded per batch_decode call by the fallback scan
+_FALLBACK_PROBE_CHUNK = 8
+
 
 class SmartBytecodeDecoder:
     """A smart decoder that handles partial token sequences and recovers from malformed characters.
@@ -10,27 +18,30 @@ class SmartBytecodeDecoder:
     - Unified recovery logic to reduce code duplication
     - Binary search for finding valid decode points
     - Caching of recent decode results
+    - Caching of tokenizer decodes per token sequence, so recovery probes are
+      not re-decoded when the same buffered prefix comes up again
     - Fast malformed character detection
     """
 
-    def __init__(self, processor, fallback_char: str = "", cache_size: int = 16):
+    def __init__(self, processor, fallback_char: str = "", cache_size: int = 16, decode_cache_size: int = 256):
         self.processor = processor
         self.fallback_char = fallback_char
-        # Use frozenset for O(1) lookups instead of iterating
-        self.malformed_indicators = frozenset({"�", "\\ufffd", "\ufffd"})  # noqa
+        # "�" and "\ufffd" are the same character; `_MALFORMED_SEARCH` matches both indicators in one scan
+        self.malformed_indicators = frozenset({"\ufffd", "\\ufffd"})
         # Simple LRU cache for recent successful decode points
         self._decode_cache = {}
         self._cache_size = cache_size
         self._cache_hits = 0
         self._cache_misses = 0
+        # Per-instance LRU over processor.decode, keyed by the exact token sequence
+        self._decode_cached = functools.lru_cache(maxsize=decode_cache_size)(self._decode)
+
+    def _decode(self, tokens: tuple[int, ...]) -> str:
+        return self.processor.decode(list(tokens), skip_special_tokens=True)
 
     def contains_malformed_chars(self, text: str) -> bool:
         """Check if text contains malformed Unicode characters - optimized."""
-        # Fast path: check for most common indicator first
-        if "�" in text:
-            return True
-        # Check other indicators only if needed
-        return any(ind in text for ind in {"\\ufffd", "\ufffd"})
+        return _MALFORMED_SEARCH(text) is not None
 
     def decode_with_recovery(
         self,
@@ -47,7 +58,7 @@ class SmartBytecodeDecoder:
 
         # Try full decode first
         try:
-            full_decoded = self.processor.decode(tokens_to_decode, skip_special_tokens=True)
+            full_decoded = self._decode_cached(tuple(tokens_to_decode))
 
             # Fast path: successful clean decode
             if not self.contains_malformed_chars(full_decoded):
@@ -81,7 +92,7 @@ class SmartBytecodeDecoder:
             if cached_point < token_count:
                 # Try cached decode point first
                 try:
-                    partial_decoded = self.processor.decode(tokens[:cached_point], skip_special_tokens=True)
+                    partial_decoded = self._decode_cached(tuple(tokens[:cached_point]))
                     if not self.contains_malformed_chars(partial_decoded):
                         new_text = self._extract_new_text(partial_decoded, previous_good_text)
                         return new_text, tokens[cached_point:], True
@@ -90,6 +101,18 @@ class SmartBytecodeDecoder:
         else:
             self._cache_misses += 1
 
+        # Clean decodes of each probed prefix length (None if malformed or failed), shared by both searches
+        probed: dict[int, str | None] = {}
+
+        def probe(length: int) -> str | None:
+            if length not in probed:
+                try:
+                    partial_decoded = self._decode_cached(tuple(tokens[:length]))
+                    probed[length] = None if self.contains_malformed_chars(partial_decoded) else partial_decoded
+                except Exception:
+                    probed[length] = None
+            return probed[length]
+
         # Binary search for valid decode point (more efficient than linear scan)
         left, right = 1, token_count - 1
         last_good_point = 0
@@ -98,22 +121,16 @@ class SmartBytecodeDecoder:
         while left <= right:
             # Bias towards larger chunks (they're more likely to decode properly)
             mid = (left + right + 1) // 2
-
-            try:
-                partial_decoded = self.processor.decode(tokens[:mid], skip_special_tokens=True)
-
-                # Check if this decode point is valid
-                if not self.contains_malformed_chars(partial_decoded):
-                    last_good_point = mid
-                    last_good_text = partial_decoded
-                    # Try to decode more tokens
-                    left = mid + 1
-                else:
-                    # This point has malformed chars, try fewer tokens
-                    right = mid - 1
-
-            except Exception:
-                # Decode failed, try fewer tokens
+            partial_decoded = probe(mid)
+
+            # Check if this decode point is valid
+            if partial_decoded is not None:
+                last_good_point = mid
+                last_good_text = partial_decoded
+                # Try to decode more tokens
+                left = mid + 1
+            else:
+                # This point has malformed chars or failed to decode, try fewer tokens
                 right = mid - 1
 
         # If we found a good decode point, use it
@@ -135,22 +152,45 @@ class SmartBytecodeDecoder:
             return new_text, remaining_tokens, True
 
         # Fall back to linear search from the end if binary search fails
-        # (This handles edge cases where binary search might miss valid points)
-        for i in range(token_count - 1, 0, -1):
-            try:
-                partial_decoded = self.processor.decode(tokens[:i], skip_special_tokens=True)
-                if not self.contains_malformed_chars(partial_decoded):
+        # (This handles edge cases where binary search might miss valid points).
+        # Lengths the binary search already rejected are skipped without decoding again,
+        # and the rest are decoded longest first in small batch_decode chunks, stopping
+        # at the first clean prefix instead of decoding every prefix up front.
+        candidates = [i for i in range(token_count - 1, 0, -1) if i not in probed]
+        for start in range(0, len(candidates), _FALLBACK_PROBE_CHUNK):
+            chunk = candidates[start : start + _FALLBACK_PROBE_CHUNK]
+            self._batch_probe(tokens, chunk, probed)
+            for i in chunk:
+                partial_decoded = probe(i)
+                if partial_decoded is not None:
                     new_text = self._extract_new_text(partial_decoded, previous_good_text)
                     remaining_tokens = tokens[i:]
                     logger.debug(f"Fallback recovery: buffering {len(remaining_tokens)} tokens")
                     return new_text, remaining_tokens, True
-            except Exception:
-                continue
 
         # Complete failure
         logger.warning("Could not find any valid decode point, using fallback")
         return self.fallback_char, [], True
 
+    def _batch_probe(self, tokens: list[int], lengths: list[int], probed: dict[int, str | None]) -> None:
+        """Decodes the prefixes `tokens[:length]` for all `lengths` in one `batch_decode` call.
+
+        Results are stored in `probed` like single probes (None for malformed
+        decodes). If the processor has no `batch_decode`, the batch fails or it
+        returns a different number of texts, nothing is stored and the caller
+        decodes the prefixes one by one.
+        """
+        batch_decode = getattr(self.processor, "batch_decode", None)
+        if batch_decode is None or not lengths:
+            return
+        try:
+            decoded = batch_decode([tokens[:length] for length in lengths], skip_special_tokens=True)
+            results = list(zip(lengths, decoded, strict=True))
+        except Exception:
+            return
+        for length, text in results:
+            probed[length] = None if self.contains_malformed_chars(text) else text
+
     def _extract_new_text(self, decoded_text: str, previous_text: str) -> str:
         """Extract new text from decoded result - optimized."""
         if not previous_text:
@@ -170,4 +210,5 @@ class SmartBytecodeDecoder:
             "cache_misses": self._cache_misses,
             "hit_rate": self._cache_hits / total if total > 0 else 0,
             "cache_size": len(self._decode_cache),
+            "decode_cache": self._decode_cached.cache_info()._asdict(),
         }
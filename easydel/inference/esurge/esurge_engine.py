@@ -271,6 +271,8 @@ class eSurge:
         prefer_preserve_prompt: bool = True,
         decode_truncated_prompt: bool = True,
         bytecode_decode: bool = True,
+        padding_gap: int = 0,
+        seed: int | None = None,
         **kwargs,
     ):
         """Initialize the eSurge engine.
@@ -311,6 +313,9 @@ class eSurge:
                 UTF-8 sequences. This prevents "�" characters during streaming when
                 tokens split multi-byte UTF-8 characters. Uses intelligent buffering
                 and progressive backtracking to find clean decode points.
+            padding_gap: Step between the runner's token-count buckets once they pass
+                ``padding_gap``; 0 keeps power-of-two buckets throughout.
+            seed: Seed for the runner's sampling PRNG. If None, a time-based seed is used.
             **kwargs: Additional configuration passed to model loading.
 
         Raises:
@@ -391,6 +396,8 @@ class eSurge:
             max_model_len=max_model_len,
             min_input_pad=min_input_pad,
             max_num_seqs=max_num_seqs,
+            padding_gap=padding_gap,
+            seed=seed,
             verbose=runner_verbose,
         )
         if compile_runner:
@@ -13,10 +13,12 @@
 # limitations under the License.
 from __future__ import annotations
 
+import functools
 from collections.abc import Hashable
 from dataclasses import dataclass
 from typing import NamedTuple, TypeVar
 
+import jax
 from jax import Array
 from jax import numpy as jnp
 
@@ -45,22 +47,37 @@ class LogprobsTensors(NamedTuple):
     selected_token_ranks: Array
 
     def tolists(self):
+        # device_get starts the three device->host copies together, then each list is built from NumPy
+        logprob_token_ids, logprobs, selected_token_ranks = jax.device_get(
+            (self.logprob_token_ids, self.logprobs, self.selected_token_ranks)
+        )
         return LogprobsLists(
-            self.logprob_token_ids.tolist(),
-            self.logprobs.tolist(),
-            self.selected_token_ranks.tolist(),
+            logprob_token_ids.tolist(),
+            logprobs.tolist(),
+            selected_token_ranks.tolist(),
         )
 
     @staticmethod
     def empty(num_positions: int, num_tokens_per_position: int) -> LogprobsTensors:
-        logprob_token_ids = jnp.empty((num_positions, num_tokens_per_position), dtype=jnp.int32)
-        logprobs = jnp.empty_like(logprob_token_ids, dtype=jnp.float32)
-        selected_token_ranks = jnp.empty(num_positions, dtype=jnp.int32)
-        return LogprobsTensors(
-            logprob_token_ids=logprob_token_ids,
-            logprobs=logprobs,
-            selected_token_ranks=selected_token_ranks,
-        )
+        """Returns placeholder tensors of the given shape, shared per shape.
+
+        JAX arrays are immutable, so one set of buffers per shape can be handed
+        out to every caller instead of allocating three new ones each time.
+        Callers must not donate or `delete()` the returned arrays.
+        """
+        return _empty_logprobs_tensors(num_positions, num_tokens_per_position)
+
+
+@functools.lru_cache(maxsize=16)
+def _empty_logprobs_tensors(num_positions: int, num_tokens_per_position: int) -> LogprobsTensors:
+    logprob_token_ids = jnp.empty((num_positions, num_tokens_per_position), dtype=jnp.int32)
+    logprobs = jnp.empty_like(logprob_token_ids, dtype=jnp.float32)
+    selected_token_ranks = jnp.empty(num_positions, dtype=jnp.int32)
+    return LogprobsTensors(
+        logprob_token_ids=logprob_token_ids,
+        logprobs=logprobs,
+        selected_token_ranks=selected_token_ranks,
+    )
 
 
 @dataclass
@@ -300,6 +300,28 @@ class PageTable:
         new_npr = self.num_pages_per_row.at[tgt].set(num_pages)
         return replace(self, page_table=new_pt, num_pages_per_row=new_npr)
 
+    def move_rows(self, srcs: Sequence[int], tgts: Sequence[int]) -> PageTable:
+        """Batched move_row() for several disjoint source/target pairs.
+
+        Args:
+            srcs: Source row indices.
+            tgts: Target row indices, one per source. No target may also be a source.
+
+        Returns:
+            A new PageTable with all rows moved in a single gather/scatter.
+        """
+        if not srcs:
+            return self
+        src = jnp.asarray(srcs, dtype=jnp.int32)
+        tgt = jnp.asarray(tgts, dtype=jnp.int32)
+        num_pages = self.num_pages_per_row[src]  # [K]
+        cols = jnp.arange(self.max_num_pages_per_req, dtype=jnp.int32)
+        mask = cols[None, :] < num_pages[:, None]  # [K, C]
+        new_tgt_rows = jnp.where(mask, self.page_table[src], self.page_table[tgt])
+        new_pt = self.page_table.at[tgt].set(new_tgt_rows)
+        new_npr = self.num_pages_per_row.at[tgt].set(num_pages)
+        return replace(self, page_table=new_pt, num_pages_per_row=new_npr)
+
     def swap_row(self, src: int, tgt: int) -> PageTable:
         """Swap two rows in the page table.
 
@@ -633,6 +655,19 @@ class MultiGroupPageTable:
         new_pts = tuple(pt.move_row(src, tgt) for pt in self.page_tables)
         return replace(self, page_tables=new_pts)
 
+    def move_rows(self, srcs: Sequence[int], tgts: Sequence[int]) -> MultiGroupPageTable:
+        """Move several rows across all groups.
+
+        Args:
+            srcs: Source row indices.
+            tgts: Target row indices, one per source.
+
+        Returns:
+            A new MultiGroupPageTable with rows moved.
+        """
+        new_pts = tuple(pt.move_rows(srcs, tgts) for pt in self.page_tables)
+        return replace(self, page_tables=new_pts)
+
     def swap_row(self, src: int, tgt: int) -> MultiGroupPageTable:
         """Swap two rows across all groups.
 
@@ -91,6 +91,33 @@ def _get_padded_num_reqs_with_upper_limit(x: int, upper_limit: int, min_input_pa
     return min(res, upper_limit)
 
 
+def _ragged_arange(
+    lens: jax.Array,
+    cum_lens: jax.Array,
+    iota: jax.Array,
+    valid: jax.Array,
+) -> tuple[jax.Array, jax.Array]:
+    """Flattened ``concatenate([arange(n) for n in lens])`` over a fixed-size index range.
+
+    Uses the repeat-offset-subtract idiom: every position is mapped to the segment
+    that owns it and the segment start is subtracted, so no per-segment ranges are
+    materialized.
+
+    Args:
+        lens: Length of each segment [num_segments].
+        cum_lens: Inclusive cumulative sum of ``lens`` [num_segments].
+        iota: Flat positions to map, usually ``arange(size)`` [size].
+        valid: Mask of positions that fall inside ``sum(lens)`` [size].
+
+    Returns:
+        Tuple of (segment index, offset within segment) per position. Invalid
+        positions are attributed to segment 0.
+    """
+    segment = jnp.searchsorted(cum_lens, iota, side="right").astype(iota.dtype)
+    segment = jnp.where(valid, segment, 0)
+    return segment, iota - (cum_lens - lens)[segment]
+
+
 class ExecutionManager:
     """Manages precompiled execution functions for efficient model inference.
 
@@ -143,6 +170,7 @@ class ExecutionManager:
         max_num_reqs: int = 16,
         max_num_tokens: int | None = None,
         metadata: PagesCacheMetaData = None,
+        seed: int | None = None,
     ):
         """Initialize the executor manager.
 
@@ -163,6 +191,8 @@ class ExecutionManager:
             max_num_reqs: Maximum number of requests.
             max_num_tokens: Maximum number of tokens for batching.
             metadata: Pages cache metadata.
+            seed: Seed for the sampling PRNG key, which is split and carried across steps.
+                If None, a time-based seed is used so separate runs draw different samples.
         """
         logger.info(f"Initializing ExecutionManager with {use_combined_forward=}, {use_fused_step=}")
         self.model = model
@@ -179,9 +209,17 @@ class ExecutionManager:
         logger.debug("Splitting model module for graph-based execution")
         self.graphdef, self.graphstate, self.graphother = model.split_module()
 
-        self.rng_key = jax.random.PRNGKey(0)
+        if seed is None:
+            seed = int(time.time())
+        self.rng_key = jax.random.PRNGKey(seed)
 
         self._empty_sharding = jax.NamedSharding(mesh, jax.sharding.PartitionSpec())
+        # Extracted once so every executable sees the very same sharding objects for
+        # the donated cache on input and output.
+        self._kv_pages_shardings = es.extract_shardings(self.kv_pages, self.mesh)
+        self._graphstate_shardings = es.extract_shardings(self.graphstate, self.mesh)
+        self._graphother_shardings = es.extract_shardings(self.graphother, self.mesh)
+        self._kv_donation_checked = False
 
         self._main_fn: None | pjit.JitWrapped = None
         self._compute_hidden_states_fn: None | pjit.JitWrapped = None
@@ -194,6 +232,29 @@ class ExecutionManager:
         self.init_fns()
         logger.debug("ExecutionManager initialization complete")
 
+    def _kv_pages_buffer_pointer(self) -> int | None:
+        """Return the device pointer of the first KV cache shard, or None if unavailable."""
+        try:
+            leaf = jax.tree_util.tree_leaves(self.kv_pages)[0]
+            shard = leaf.addressable_shards[0].data
+            if shard.devices().pop().platform == "cpu":
+                return None  # CPU does not honor buffer donation
+            return shard.unsafe_buffer_pointer()
+        except Exception:
+            return None
+
+    def _verify_kv_pages_donation(self, pointer_before: int | None) -> None:
+        """Warn once if the step returned a fresh KV cache instead of updating the donated one."""
+        self._kv_donation_checked = True
+        if pointer_before is None:
+            return
+        pointer_after = self._kv_pages_buffer_pointer()
+        if pointer_after is not None and pointer_after != pointer_before:
+            logger.warning(
+                "KV pages were not donated in place; the full cache is copied on every step. "
+                "Check that kv_pages in/out shardings match."
+            )
+
     def execute_fused(
         self,
         num_tokens: int,
@@ -258,6 +319,7 @@ class ExecutionManager:
             This method requires use_fused_step=True during initialization.
         """
         fn = self.get_compiled_key(num_tokens, padded_num_reqs)
+        kv_pointer = None if self._kv_donation_checked else self._kv_pages_buffer_pointer()
         if self.use_aot_forward:
             # AOT: function is already compiled, no static arguments needed
             result = fn(
@@ -311,6 +373,8 @@ class ExecutionManager:
             out_tokens_full,
             valid_mask_full,
         ) = result
+        if not self._kv_donation_checked:
+            self._verify_kv_pages_donation(kv_pointer)
 
         return (
             dev_state,
@@ -359,6 +423,8 @@ class ExecutionManager:
         if self.use_fused_step:
             raise ValueError("Use execute_fused for fused step execution")
         static_arguments = (self.graphdef,) if not self.use_aot_forward else ()
+        if not self._kv_donation_checked:
+            kv_pointer = self._kv_pages_buffer_pointer()
         if self.use_combined_forward:
             fn = self.get_compiled_key(input_ids_view.shape[0], padded_num_reqs)
             token_ids, self.kv_pages, self.rng_key = fn(
@@ -373,6 +439,8 @@ class ExecutionManager:
                 sampling_metadata,
                 self.rng_key,
             )
+            if not self._kv_donation_checked:
+                self._verify_kv_pages_donation(kv_pointer)
             return token_ids, None
         else:
             hfn, tfn = self.get_compiled_key(input_ids_view.shape[0], padded_num_reqs)
@@ -384,13 +452,15 @@ class ExecutionManager:
                 position_ids_view,
                 self.kv_pages,
                 cache_metadata,
+                logits_indices,
             )
+            if not self._kv_donation_checked:
+                self._verify_kv_pages_donation(kv_pointer)
             token_ids, self.rng_key = tfn(
                 *static_arguments,
                 self.graphstate,
                 self.graphother,
                 hidden_states,
-                logits_indices,
                 sampling_metadata,
                 self.rng_key,
             )
@@ -420,7 +490,7 @@ class ExecutionManager:
         Note:
             Compilation progress is logged using a progress bar. The total number
             of compilations is len(num_tokens_paddings) * number of unique padded
-            request counts.
+            request counts, or just len(num_tokens_paddings) in fused step mode.
 
         Example:
             >>> executor.compile(
@@ -436,7 +506,11 @@ class ExecutionManager:
         logger.debug(f"Max pages per request: {max_pages_per_req}, Max requests: {max_num_reqs}")
 
         ufn = partial(_get_padded_num_reqs_with_upper_limit, min_input_pad=self.min_input_pad)
-        reqs_padds = list(set([ufn(num_reqs, max_num_reqs) for num_reqs in range(max_num_reqs)]))
+        reqs_padds = sorted(set([ufn(num_reqs, max_num_reqs) for num_reqs in range(max_num_reqs)]))
+        if self.use_fused_step:
+            # The fused step derives the padded request count on device, so a single
+            # executable per token bucket serves every request bucket.
+            reqs_padds = reqs_padds[-1:]
         total_compilations = len(num_tokens_paddings) * len(reqs_padds)
         compilation_count = 0
 
@@ -527,8 +601,11 @@ class ExecutionManager:
 
         Returns:
             A callable that computes hidden states from input tokens without
-            applying the language model head. The function is wrapped with ejit
-            for efficient execution.
+            applying the language model head. Only the rows selected by
+            ``logits_indices`` are returned, so the intermediate passed to the
+            tokens function is [padded_num_reqs, hidden_size] rather than
+            [num_tokens, hidden_size]. The function is wrapped with ejit for
+            efficient execution.
 
         Note:
             This function is used in separate execution mode where hidden states
@@ -539,14 +616,15 @@ class ExecutionManager:
             static_argnums=(0,),
             donate_argnames=["input_ids", "position_ids", "kv_pages"],
             in_shardings=(
-                es.extract_shardings(self.graphstate, self.mesh),
-                es.extract_shardings(self.graphother, self.mesh),
+                self._graphstate_shardings,
+                self._graphother_shardings,
                 self._empty_sharding,  # input_ids
                 self._empty_sharding,  # position_ids
-                es.extract_shardings(self.kv_pages, self.mesh),  # kv_pages
+                self._kv_pages_shardings,  # kv_pages
                 self._empty_sharding,  # cache_metadata
+                self._empty_sharding,  # logits_indices
             ),
-            out_shardings=(self._empty_sharding, es.extract_shardings(self.kv_pages, self.mesh)),
+            out_shardings=(self._empty_sharding, self._kv_pages_shardings),
         )
         def _fn(
             graphdef,
@@ -556,6 +634,7 @@ class ExecutionManager:
             position_ids: jax.Array,
             kv_pages: PagesCache,
             cache_metadata: PagesMetadata,
+            logits_indices: jax.Array,
         ):
             model: EasyDeLBaseModule = nn.merge(graphdef, graphstate, graphother)
             with model.mesh:
@@ -566,7 +645,7 @@ class ExecutionManager:
                     cache_metadata=cache_metadata,
                     apply_lm_head=False,
                 )
-                return output.last_hidden_state.squeeze(0), output.past_key_values
+                return output.last_hidden_state.squeeze(0)[logits_indices], output.past_key_values
 
         return _fn
 
@@ -574,9 +653,9 @@ class ExecutionManager:
         """Create function for generating tokens from hidden states.
 
         Returns:
-            A callable that applies the language model head to hidden states
-            and performs token sampling. The function is wrapped with ejit
-            for efficient execution.
+            A callable that applies the language model head to the already
+            selected hidden states and performs token sampling. The function
+            is wrapped with ejit for efficient execution.
 
         Note:
             This function is used in separate execution mode where hidden states
@@ -586,10 +665,9 @@ class ExecutionManager:
         @ejit(
             static_argnums=(0,),
             in_shardings=(
-                es.extract_shardings(self.graphstate, self.mesh),
-                es.extract_shardings(self.graphother, self.mesh),
+                self._graphstate_shardings,
+                self._graphother_shardings,
                 self._empty_sharding,  # hidden_states
-                self._empty_sharding,  # logits_indices
                 self._empty_sharding,  # sampling_params
                 self._empty_sharding,  # rng_key
             ),
@@ -600,13 +678,12 @@ class ExecutionManager:
             graphstate,
             graphother,
             hidden_states: jax.Array,
-            logits_indices: jax.Array,
             sampling_params: ModelRunnerSamplingMetadata,
             rng_key: jax.random.PRNGKey,
         ):
             model: EasyDeLBaseModule = nn.merge(graphdef, graphstate, graphother)
             with model.mesh:
-                logits = model.apply_lm_head(hidden_states[logits_indices])
+                logits = model.apply_lm_head(hidden_states)
                 keys = jax.random.split(rng_key, logits.shape[0] + 1)
                 samples = jax.vmap(sample_top_p_efficient, in_axes=(0, 0, 0, 0, None), out_axes=0)(
                     logits,
@@ -636,12 +713,12 @@ class ExecutionManager:
         """
         max_num_reqs = int(self.max_num_reqs)
         page_size = int(self.metadata.page_size)
-        max_pages_per_req = int(self.metadata.max_num_pages_per_req)
         num_reqs_max_model_len = min(int(self.metadata.get_max_num_seqs()), max_num_reqs)
         slices_per_page = int(self.metadata.num_slices_per_kv_cache_update_page)
         page_table_pad = jnp.int32(PAGE_TABLE_PADDING_VAL)
         slot_mapping_pad = jnp.int32(SLOT_MAPPING_PADDING_VAL)
         max_num_tokens = int(self.max_model_len)
+        min_input_pad = int(self.min_input_pad)
         max_padded_slices = int(self.metadata.get_padded_num_slices(max_num_tokens, max_num_reqs))
 
         i_tokens = jnp.arange(max_num_tokens, dtype=jnp.int32)
@@ -662,10 +739,10 @@ class ExecutionManager:
                 "slot_mapping_buf",
             ],
             in_shardings=(
-                es.extract_shardings(self.graphstate, self.mesh),  # graphstate
-                es.extract_shardings(self.graphother, self.mesh),  # graphother
+                self._graphstate_shardings,  # graphstate
+                self._graphother_shardings,  # graphother
                 self._empty_sharding,  # dev_state (PyTree)
-                es.extract_shardings(self.kv_pages, self.mesh),  # kv_pages
+                self._kv_pages_shardings,  # kv_pages
                 self._empty_sharding,  # scheduled_full
                 self._empty_sharding,  # req_num_tokens_full
                 self._empty_sharding,  # active_mask_full
@@ -679,7 +756,7 @@ class ExecutionManager:
             ),
             out_shardings=(
                 self._empty_sharding,  # dev_state (updated)
-                es.extract_shardings(self.kv_pages, self.mesh),  # kv_pages
+                self._kv_pages_shardings,  # kv_pages
                 self._empty_sharding,  # input_ids_buf
                 self._empty_sharding,  # position_ids_buf
                 self._empty_sharding,  # query_start_loc_buf
@@ -717,15 +794,19 @@ class ExecutionManager:
             scheduled = jnp.where(mask_reqs, scheduled_full, 0)
 
             cum = jnp.cumsum(scheduled)
-            total = jnp.sum(scheduled)
+            total = cum[-1]
 
             # token-level mapping
             valid_tok = i_tokens < total
-            req_for_tok = jnp.searchsorted(cum, i_tokens, side="right")
-            req_for_tok = jnp.where(valid_tok, req_for_tok, 0)
-            cum_prev = jnp.concatenate([jnp.zeros((1,), jnp.int32), cum[:-1]])
+            # Pure decode (one token per live request) maps token i to request i, so the
+            # searchsorted-based ragged arange can be skipped entirely.
+            is_decode = jnp.all(jnp.where(mask_reqs, scheduled == 1, True))
+            req_for_tok, off_in_req = jax.lax.cond(
+                is_decode,
+                lambda: (jnp.where(valid_tok, i_tokens, 0), jnp.zeros_like(i_tokens)),
+                lambda: _ragged_arange(scheduled, cum, i_tokens, valid_tok),
+            )
             base_pos = dev_state.num_computed_tokens[req_for_tok]
-            off_in_req = i_tokens - cum_prev[req_for_tok]
             positions_full = jnp.where(valid_tok, base_pos + off_in_req, 0)
 
             safe_pos = jnp.where(valid_tok, positions_full, 0)
@@ -735,15 +816,16 @@ class ExecutionManager:
             input_ids_buf = input_ids_buf.at[:].set(in_ids_full)
             position_ids_buf = position_ids_buf.at[:].set(positions_full)
 
-            qsl = jnp.zeros((max_num_reqs + 1,), dtype=jnp.int32).at[1:].set(cum)
-            seq_lens = jnp.where(mask_reqs, dev_state.num_computed_tokens + scheduled, 0)
+            # Write into the donated buffers so XLA reuses their allocations
+            qsl = query_start_loc_buf.at[0].set(0).at[1:].set(cum)
+            seq_lens = seq_lens_buf.at[:].set(jnp.where(mask_reqs, dev_state.num_computed_tokens + scheduled, 0))
 
             # Get page table and ensure it matches expected dimensions
             pt_array = dev_state.page_table[0].get_array()
             # Ensure we only use the correct number of rows
             pt_src = pt_array[: min(pt_array.shape[0], num_reqs_max_model_len), :]
             mask_rows = i_rows_pt < jnp.minimum(nr, jnp.int32(num_reqs_max_model_len))
-            pt = jnp.where(mask_rows[:, None], pt_src, page_table_pad)
+            pt = pages_tables_buf.at[:].set(jnp.where(mask_rows[:, None], pt_src, page_table_pad))
 
             s = dev_state.num_computed_tokens
             e = s + scheduled
@@ -751,7 +833,7 @@ class ExecutionManager:
             lpe = (jnp.maximum(e, 1) - 1) // page_size
             page_lens = jnp.where(scheduled > 0, lpe - lps + 1, 0)
             page_cum = jnp.cumsum(page_lens)
-            total_pages = jnp.sum(page_lens)
+            total_pages = page_cum[-1]
 
             # slot_mapping
             pages_est = jnp.minimum(
@@ -764,24 +846,21 @@ class ExecutionManager:
             within_pad = i_slices < padded_num_slices
             slice_active = valid_slice & within_pad
 
-            page_cum_prev = jnp.concatenate([jnp.zeros((1,), jnp.int32), page_cum[:-1]])
-            req_for_slice = jnp.searchsorted(page_cum, i_slices, side="right")
-            req_for_slice = jnp.where(slice_active, req_for_slice, 0)
-            local_off = i_slices - page_cum_prev[req_for_slice]
-
-            pt_full = dev_state.page_table[0].get_array().reshape((-1,))
-            gpi = req_for_slice * jnp.int32(max_pages_per_req) + lps[req_for_slice] + local_off
-            page_numbers = jnp.where(slice_active, pt_full[gpi], 0)
-
-            s_mod = s % page_size
-            e_mod = ((jnp.maximum(e, 1) - 1) % page_size) + 1
-            lens_rep = page_lens[req_for_slice]
-
-            is_first = local_off == 0
-            is_last = local_off == (lens_rep - 1)
-
-            kv_local_st = jnp.where(is_first, s_mod[req_for_slice], jnp.int32(0))
-            kv_local_en = jnp.where(is_last, e_mod[req_for_slice], jnp.int32(page_size))
+            page_cum_prev = page_cum - page_lens
+            req_for_slice, local_off = _ragged_arange(page_lens, page_cum, i_slices, slice_active)
+
+            page_numbers = pt_array[req_for_slice, lps[req_for_slice] + local_off]
+            page_numbers = jnp.where(slice_active, page_numbers, 0)
+
+            # Only the first and last slice of a request cover a partial page, so patch
+            # their bounds with two scatters; requests without pages are dropped.
+            has_pages = page_lens > 0
+            first_idx = jnp.where(has_pages, page_cum_prev, jnp.int32(max_padded_slices))
+            last_idx = jnp.where(has_pages, page_cum - 1, jnp.int32(max_padded_slices))
+            kv_local_st = jnp.zeros((max_padded_slices,), dtype=jnp.int32)
+            kv_local_st = kv_local_st.at[first_idx].set(s % page_size, mode="drop")
+            kv_local_en = jnp.full((max_padded_slices,), page_size, dtype=jnp.int32)
+            kv_local_en = kv_local_en.at[last_idx].set(((jnp.maximum(e, 1) - 1) % page_size) + 1, mode="drop")
             slice_lens = jnp.maximum(kv_local_en - kv_local_st, 0)
             kv_cache_start = kv_local_st + page_numbers * page_size
 
@@ -790,16 +869,14 @@ class ExecutionManager:
             new_kv_start = jnp.roll(csl, 1).at[0].set(0)
             new_kv_start = jnp.where(slice_active, new_kv_start, 0)
 
-            sm0 = jnp.where(within_pad, jnp.where(slice_active, kv_cache_start, slot_mapping_pad), slot_mapping_pad)
-            sm1 = jnp.where(within_pad, jnp.where(slice_active, new_kv_start, slot_mapping_pad), slot_mapping_pad)
-            sm2 = jnp.where(within_pad, jnp.where(slice_active, slice_lens, slot_mapping_pad), slot_mapping_pad)
-            slot_mapping_buf = slot_mapping_buf.at[0, :].set(sm0)
-            slot_mapping_buf = slot_mapping_buf.at[1, :].set(sm1)
-            slot_mapping_buf = slot_mapping_buf.at[2, :].set(sm2)
+            # SoA layout [3, max_padded_slices]; slice_active already implies within_pad.
+            slot_mapping = jnp.stack([kv_cache_start, new_kv_start, slice_lens]).astype(slot_mapping_buf.dtype)
+            slot_mapping = jnp.where(slice_active[None, :], slot_mapping, slot_mapping_pad)
+            slot_mapping_buf = slot_mapping_buf.at[:].set(slot_mapping)
 
             nr_safe = jnp.maximum(nr, 1)
             next_pow2 = jnp.left_shift(1, jnp.ceil(jnp.log2(nr_safe)).astype(jnp.int32))
-            padded_num_reqs = jnp.where(nr <= jnp.int32(self.min_input_pad), jnp.int32(self.min_input_pad), next_pow2)
+            padded_num_reqs = jnp.where(nr <= jnp.int32(min_input_pad), jnp.int32(min_input_pad), next_pow2)
             padded_num_reqs = jnp.minimum(padded_num_reqs, jnp.int32(max_num_reqs))
 
             tmp_logits = qsl[1:] - 1
@@ -823,8 +900,8 @@ class ExecutionManager:
                         query_start_loc=qsl[: num_reqs_max_model_len + 1],
                         num_seqs=jnp.array([nr], dtype=jnp.int32),
                         num_kv_update_slices=jnp.array([total_pages], dtype=jnp.int32),
-                        num_slices_per_kv_cache_update_page=self.metadata.num_slices_per_kv_cache_update_page,
-                        page_size=self.metadata.page_size,
+                        num_slices_per_kv_cache_update_page=slices_per_page,
+                        page_size=page_size,
                     ),
                     apply_lm_head=False,
                 )
@@ -844,11 +921,11 @@ class ExecutionManager:
             meets_len_full = seq_lens_now_full >= req_num_tokens_full
             valid_mask_full = (i_reqs < nr) & active_mask_full & (scheduled > 0) & meets_len_full
 
-            j_pos_full = jnp.clip(seq_lens_now_full, 0, self.max_model_len - 1)
-            curr_vals_full = dev_state.token_ids[i_reqs, j_pos_full]
-            delta_full = jnp.where(valid_mask_full, sampled_flat - curr_vals_full, 0)
+            # Rows without a valid sample are routed out of bounds and dropped by the scatter.
+            j_pos_full = jnp.clip(seq_lens_now_full, 0, max_num_tokens - 1)
+            j_pos_full = jnp.where(valid_mask_full, j_pos_full, jnp.int32(max_num_tokens))
 
-            token_ids = dev_state.token_ids.at[(i_reqs, j_pos_full)].add(delta_full)
+            token_ids = dev_state.token_ids.at[i_reqs, j_pos_full].set(sampled_flat, mode="drop")
             num_tokens = dev_state.num_tokens + valid_mask_full.astype(dev_state.num_tokens.dtype)
 
             dev_state = dev_state.with_updates(token_ids=token_ids, num_tokens=num_tokens)
@@ -887,11 +964,11 @@ class ExecutionManager:
             static_argnums=(0,),
             donate_argnames=["input_ids", "position_ids", "kv_pages"],
             in_shardings=(
-                es.extract_shardings(self.graphstate, self.mesh),
-                es.extract_shardings(self.graphother, self.mesh),
+                self._graphstate_shardings,
+                self._graphother_shardings,
                 self._empty_sharding,  # input_ids
                 self._empty_sharding,  # position_ids
-                es.extract_shardings(self.kv_pages, self.mesh),  # kv_pages
+                self._kv_pages_shardings,  # kv_pages
                 self._empty_sharding,  # cache_metadata
                 self._empty_sharding,  # logits_indices
                 self._empty_sharding,  # sampling_params
@@ -899,7 +976,7 @@ class ExecutionManager:
             ),
             out_shardings=(
                 self._empty_sharding,
-                es.extract_shardings(self.kv_pages, self.mesh),
+                self._kv_pages_shardings,
                 self._empty_sharding,
             ),
         )
@@ -956,7 +1033,7 @@ class ExecutionManager:
             compargs: Compilation arguments for the model functions.
         """
         if self.use_fused_step:
-            fused_key = (num_tokens, padded_num_reqs, "fused")
+            fused_key = (num_tokens, "fused")
             if fused_key not in self._lowerd_history.keys():
                 logger.debug(f"Compiling fused step function for key {fused_key}")
                 lowered = self._fused_step_fn.lower(num_tokens, *compargs[2])
@@ -1011,7 +1088,7 @@ class ExecutionManager:
             (hidden_states_fn, tokens_fn) for separate mode.
         """
         if self.use_fused_step:
-            fused_key = (num_tokens, padded_num_reqs, "fused")
+            fused_key = (num_tokens, "fused")
             return self._lowerd_history[fused_key]
         elif self.use_combined_forward:
             return self._lowerd_history[(num_tokens, padded_num_reqs)]
@@ -1156,13 +1233,13 @@ class ExecutionManager:
                         num_slices_per_kv_cache_update_page=metadata.num_slices_per_kv_cache_update_page,
                         page_size=metadata.page_size,
                     ),
+                    jnp.arange(padded_num_reqs, dtype=jnp.int32),
                 ),
                 (
                     self.graphdef,
                     self.graphstate,
                     self.graphother,
-                    jnp.ones((num_tokens, self.model.config.get_text_config().hidden_size), self.model.dtype),
-                    jnp.arange(padded_num_reqs, dtype=jnp.int32),
+                    jnp.ones((padded_num_reqs, self.model.config.get_text_config().hidden_size), self.model.dtype),
                     ModelRunnerSamplingMetadata(
                         top_p=jnp.ones((padded_num_reqs,), dtype=jnp.float32),
                         temperature=jnp.ones((padded_num_reqs,), dtype=jnp.float32),
@@ -170,6 +170,8 @@ class eSurgeRunner:
         max_model_len: int = 2**13,
         min_input_pad: int = 256,
         max_num_seqs: int = 16,
+        padding_gap: int = 0,
+        seed: int | None = None,
         verbose: bool = False,
     ):
         logger.debug(f"Initializing eSurgeRunner with {max_model_len=}, {max_num_seqs=}")
@@ -192,7 +194,7 @@ class eSurgeRunner:
         self.num_tokens_paddings = self._get_token_paddings(
             min_token_size=16,
             max_token_size=self.max_model_len,
-            padding_gap=0,
+            padding_gap=padding_gap,
         )
         self.max_num_tokens = self.num_tokens_paddings[-1]
 
@@ -209,6 +211,7 @@ class eSurgeRunner:
             max_num_reqs=self.max_num_reqs,
             max_num_tokens=self.max_num_tokens,
             metadata=self.metadata,
+            seed=seed,
         )
         self.log_it = logger.info if verbose else logger.debug
         self._setup_variables()
@@ -226,6 +229,10 @@ class eSurgeRunner:
     def _get_token_paddings(min_token_size: int, max_token_size: int, padding_gap: int) -> list[int]:
         """Generate padding sizes for efficient compilation.
 
+        Buckets grow as powers of two up to ``padding_gap`` and then in steps of
+        ``padding_gap``, so large token counts are padded to the nearest multiple
+        of the gap instead of the next power of two.
+
         Args:
             min_token_size: Minimum token size (must be power of 2)
             max_token_size: Maximum token size to cover
@@ -233,6 +240,10 @@ class eSurgeRunner:
 
         Returns:
             List of padding sizes
+
+        Example:
+            >>> eSurgeRunner._get_token_paddings(16, 1024, 256)
+            [16, 32, 64, 128, 256, 512, 768, 1024]
         """
         if not ((min_token_size & (min_token_size - 1) == 0) and min_token_size > 0):
             logger.error(f"Invalid min_token_size={min_token_size}, must be power of 2")
@@ -276,9 +287,6 @@ class eSurgeRunner:
             page_sizes=[self.metadata.page_size],
         )
 
-        self.arange = jnp.arange(self.max_num_tokens, dtype=jnp.int32)
-        self.arange_np = jnp.arange(self.max_num_reqs, dtype=jnp.int32)
-
         self.input_ids_buf = jnp.zeros((self.max_num_tokens,), dtype=jnp.int32)
         self.position_ids_buf = jnp.zeros((self.max_num_tokens,), dtype=jnp.int32)
         self.query_start_loc_buf = jnp.zeros((self.max_num_reqs + 1,), dtype=jnp.int32)
@@ -297,14 +305,22 @@ class eSurgeRunner:
             dtype=jnp.int32,
         )
 
-        self.page_table_flat_buf = jnp.zeros(
-            (self.num_reqs_max_model_len * self.max_pages_per_req,),
-            dtype=jnp.int32,
-        )
-
-        self.slot_mapping_scratch_buf = jnp.zeros((self.max_padded_slices, 3), dtype=jnp.int32)
         self.num_tokens_paddings_arr = jnp.array(self.num_tokens_paddings, dtype=jnp.int32)
 
+        # Dense host lookup tables: bucket for every possible token / request count
+        token_counts = np.arange(self.max_num_tokens + 1)
+        self._token_padding_lut = np.asarray(self.num_tokens_paddings, dtype=np.int32)[
+            np.searchsorted(self.num_tokens_paddings, token_counts, side="left")
+        ]
+        self._num_reqs_padding_lut = np.fromiter(
+            (
+                _get_padded_num_reqs_with_upper_limit(x, self.max_num_reqs, self.min_input_pad)
+                for x in range(self.max_num_reqs + 1)
+            ),
+            dtype=np.int32,
+            count=self.max_num_reqs + 1,
+        )
+
         # Pre-allocated buffers for fused execution to avoid repeated allocations
         self.scheduled_full_buf = jnp.zeros((self.max_num_reqs,), dtype=jnp.int32)
         self.req_num_tokens_full_buf = jnp.zeros((self.max_num_reqs,), dtype=jnp.int32)
@@ -329,6 +345,58 @@ class eSurgeRunner:
             metadata=self.metadata,
         )
 
+    def _update_states_steady(self, scheduler_output: SchedulerOutput) -> bool:
+        """Fast path of :meth:`_update_states` for steady-state decoding.
+
+        Applies when no request finished, started or resumed from preemption and every
+        request in the sequence buffer is scheduled again. In that case only the
+        computed-token counts and page tables change, and both are updated in one
+        batched write each.
+
+        Args:
+            scheduler_output: Scheduler decisions for the current step.
+
+        Returns:
+            True if the update was handled here, False if the general path is required.
+            Nothing is modified when False is returned.
+        """
+        if scheduler_output.finished_req_ids or scheduler_output.scheduled_new_reqs:
+            return False
+
+        req_data = scheduler_output.scheduled_cached_reqs
+        req_id_to_index = self.sequence_buffer.req_id_to_index
+        num_cached = len(req_data.req_ids)
+        if (
+            num_cached != len(req_id_to_index)
+            or num_cached != len(scheduler_output.num_scheduled_tokens)
+            or any(req_data.resumed_from_preemption)
+        ):
+            return False
+
+        try:
+            req_indices = [req_id_to_index[req_id] for req_id in req_data.req_ids]
+            req_states = [self.requests[req_id] for req_id in req_data.req_ids]
+        except KeyError:
+            return False
+        if not req_indices:
+            return True
+
+        for req_state, nct, new_page_ids in zip(
+            req_states, req_data.num_computed_tokens, req_data.new_page_ids, strict=True
+        ):
+            req_state.num_computed_tokens = nct
+            for page_ids, new_ids in zip(req_state.page_ids, new_page_ids, strict=False):
+                page_ids.extend(new_ids)
+
+        idx_arr = jnp.array(req_indices, dtype=jnp.int32)
+        val_arr = jnp.array(req_data.num_computed_tokens, dtype=jnp.int32)
+        self.sequence_buffer = replace(
+            self.sequence_buffer,
+            num_computed_tokens=self.sequence_buffer.num_computed_tokens.at[idx_arr].set(val_arr),
+            page_table=self.sequence_buffer.page_table.append_rows_batch(list(req_data.new_page_ids), req_indices),
+        )
+        return True
+
     def _update_states(self, scheduler_output: SchedulerOutput) -> bool:
         """Update internal states based on scheduler output.
 
@@ -363,20 +431,22 @@ class eSurgeRunner:
             This method is called at the beginning of each execution cycle
             to ensure the runner's state matches the scheduler's decisions.
         """
-        for req_id in scheduler_output.finished_req_ids:
-            self.requests.pop(req_id, None)
+        if self._update_states_steady(scheduler_output):
+            return False
 
-        # 2) Remove finished from sequence buffer (functional)
+        # 1-2) Drop finished requests from tracking and from the sequence buffer (functional)
         removed_req_indices: list[int] = []
         for req_id in scheduler_output.finished_req_ids:
+            self.requests.pop(req_id, None)
             self.sequence_buffer, req_index = self.sequence_buffer.remove_request(req_id)
             if req_index is not None:
                 removed_req_indices.append(req_index)
 
         # 3) Remove unscheduled requests from buffer
-        scheduled_req_ids = set(scheduler_output.num_scheduled_tokens.keys())
-        cached_req_ids = set(self.sequence_buffer.req_id_to_index.keys())
-        unscheduled_req_ids = cached_req_ids - scheduled_req_ids
+        num_scheduled_tokens = scheduler_output.num_scheduled_tokens
+        unscheduled_req_ids = [
+            req_id for req_id in self.sequence_buffer.req_id_to_index if req_id not in num_scheduled_tokens
+        ]
         for req_id in unscheduled_req_ids:
             self.sequence_buffer, req_index = self.sequence_buffer.remove_request(req_id)
             if req_index is not None:
@@ -443,10 +513,11 @@ class eSurgeRunner:
 
         # 6) Add new / reinserted requests
         removed_req_indices = sorted(removed_req_indices, reverse=True)
-        for req_id in req_ids_to_add:
-            req_state = self.requests[req_id]
-            reuse_index = removed_req_indices.pop() if removed_req_indices else None
-            self.sequence_buffer = self.sequence_buffer.add_request(req_state, reuse_index)
+        reuse_indices = [removed_req_indices.pop() if removed_req_indices else None for _ in req_ids_to_add]
+        self.sequence_buffer = self.sequence_buffer.add_requests(
+            [self.requests[req_id] for req_id in req_ids_to_add],
+            reuse_indices,
+        )
 
         # 7) Condense to remove holes
         if removed_req_indices:
@@ -455,6 +526,27 @@ class eSurgeRunner:
         has_changes = len(unscheduled_req_ids) > 0 or len(req_ids_to_add) > 0
         return has_changes
 
+    def _get_num_scheduled_tokens_array(self, scheduler_output: SchedulerOutput) -> np.ndarray:
+        """Materialize scheduled token counts aligned with the sequence buffer rows.
+
+        Args:
+            scheduler_output: Scheduler decisions for the current step.
+
+        Returns:
+            np.ndarray: int32 array of length ``sequence_buffer.num_reqs``; empty slots
+            and requests without scheduled tokens are 0.
+        """
+        num_scheduled_tokens = scheduler_output.num_scheduled_tokens
+        num_reqs = self.sequence_buffer.num_reqs
+        return np.fromiter(
+            (
+                num_scheduled_tokens.get(rid, 0) if rid is not None else 0
+                for rid in self.sequence_buffer.req_ids[:num_reqs]
+            ),
+            dtype=np.int32,
+            count=num_reqs,
+        )
+
     def execute_model(self, scheduler_output: SchedulerOutput) -> ModelRunnerOutput:
         """Execute the model on scheduled requests.
 
@@ -511,74 +603,77 @@ class eSurgeRunner:
         total_sync_time = 0.0
         total_post_proc_time = 0.0
 
-        # Result lists
-        req_ids_all: list[str] = []
-        sampled_token_ids_all: list[list[int]] = []
+        # Loop invariants bound once as locals
+        max_num_reqs = self.max_num_reqs
+        window_size = self.num_reqs_max_model_len
+        token_padding_lut = self._token_padding_lut
+        num_reqs_padding_lut = self._num_reqs_padding_lut
+        num_scheduled_tokens_arr = self._get_num_scheduled_tokens_array(scheduler_output)
+        num_reqs_total = self.sequence_buffer.num_reqs
+
+        # Host-side outputs for the whole step, filled window by window
+        out_tokens_host = np.empty(num_reqs_total, dtype=np.int32)
+        valid_mask_host = np.empty(num_reqs_total, dtype=bool)
+        pending_windows: list[tuple[jax.Array, jax.Array, int, int]] = []
+
+        def drain_window(out_tokens_win: jax.Array, valid_mask_win: jax.Array, lo: int, hi: int) -> None:
+            out_tokens_host[lo:hi] = np.asarray(out_tokens_win)[: hi - lo]
+            valid_mask_host[lo:hi] = np.asarray(valid_mask_win)[: hi - lo]
 
         # Initial device state conversion
         t_dev_state_start = time.time()
         dev_state = self.sequence_buffer.to_device_state()
         t_dev_state = time.time() - t_dev_state_start
 
-        while start_index < self.sequence_buffer.num_reqs:
+        while start_index < num_reqs_total:
             # Window preparation timing
             t_prep_start = time.time()
 
-            num_reqs_total = self.sequence_buffer.num_reqs
-            scheduled_list: list[int] = []
-            req_ids_window = []
-            for i in range(start_index, min(num_reqs_total, start_index + self.num_reqs_max_model_len)):
-                rid = self.sequence_buffer.req_ids[i]
-                req_ids_window.append(rid)
-                scheduled_list.append(int(scheduler_output.num_scheduled_tokens.get(rid, 0)) if rid is not None else 0)
+            window_end = min(num_reqs_total, start_index + window_size)
+            req_ids_window = self.sequence_buffer.req_ids[start_index:window_end]
+            num_window = len(req_ids_window)
 
-            while scheduled_list and scheduled_list[-1] == 0:
-                scheduled_list.pop()
-                req_ids_window.pop()
+            # Build per-request arrays in numpy, padded to max_num_reqs for a single transfer
+            scheduled_np = np.zeros(max_num_reqs, dtype=np.int32)
+            scheduled_np[:num_window] = num_scheduled_tokens_arr[start_index:window_end]
 
-            num_reqs = len(scheduled_list)
+            # Drop trailing requests with nothing scheduled
+            scheduled_idx = np.flatnonzero(scheduled_np)
+            num_reqs = int(scheduled_idx[-1]) + 1 if scheduled_idx.size else 0
             if num_reqs == 0:
                 break
+            req_ids_window = req_ids_window[:num_reqs]
             end_index = start_index + num_reqs
 
             # Host compute: num_tokens_static = smallest bucket >= total
-            total_scheduled = sum(scheduled_list)
-            idx = bisect_left(self.num_tokens_paddings, total_scheduled)
-            if idx >= len(self.num_tokens_paddings):
-                idx = len(self.num_tokens_paddings) - 1
-            num_tokens_static = int(self.num_tokens_paddings[idx])
-
-            # Array preparation using pre-allocated buffers
-            # Only update the parts we need - no full reset needed since ExecutionManager only reads [:num_reqs]
-            if num_reqs > 0:
-                # Build arrays directly in numpy (faster for small arrays)
-                scheduled_np = np.array(scheduled_list, dtype=np.int32)
-                req_num_tokens_np = np.zeros(self.max_num_reqs, dtype=np.int32)
-                active_mask_np = np.zeros(self.max_num_reqs, dtype=bool)
-
-                for i, rid in enumerate(req_ids_window):
-                    if rid is not None:
-                        rs = self.requests.get(rid)
-                        if rs:
-                            req_num_tokens_np[i] = rs.num_tokens
-                        active_mask_np[i] = True
-
-                # Single conversion to JAX arrays
-                self.scheduled_full_buf = jnp.asarray(scheduled_np, dtype=jnp.int32)
-                if len(scheduled_np) < self.max_num_reqs:
-                    # Pad with zeros
-                    self.scheduled_full_buf = jnp.pad(
-                        self.scheduled_full_buf,
-                        (0, self.max_num_reqs - len(scheduled_np)),
-                        constant_values=0,
-                    )
-                self.req_num_tokens_full_buf = jnp.asarray(req_num_tokens_np, dtype=jnp.int32)
-                self.active_mask_full_buf = jnp.asarray(active_mask_np, dtype=bool)
-
-            # Calculate padded_num_reqs
-            nr_safe = max(num_reqs, 1)
-            next_pow2 = 1 << (nr_safe - 1).bit_length()
-            padded_num_reqs = min(self.min_input_pad if num_reqs <= self.min_input_pad else next_pow2, self.max_num_reqs)
+            total_scheduled = int(scheduled_np.sum())
+            if total_scheduled < len(token_padding_lut):
+                num_tokens_static = int(token_padding_lut[total_scheduled])
+            else:
+                idx = min(bisect_left(self.num_tokens_paddings, total_scheduled), len(self.num_tokens_paddings) - 1)
+                num_tokens_static = int(self.num_tokens_paddings[idx])
+
+            active_mask_np = np.zeros(max_num_reqs, dtype=bool)
+            active_mask_np[:num_reqs] = np.fromiter(
+                (rid is not None for rid in req_ids_window),
+                dtype=bool,
+                count=num_reqs,
+            )
+            req_num_tokens_np = np.zeros(max_num_reqs, dtype=np.int32)
+            req_num_tokens_np[:num_reqs] = np.fromiter(
+                (rs.num_tokens if (rs := self.requests.get(rid)) is not None else 0 for rid in req_ids_window),
+                dtype=np.int32,
+                count=num_reqs,
+            )
+
+            # One batched transfer, placed directly with the sharding the executable expects
+            (
+                self.scheduled_full_buf,
+                self.req_num_tokens_full_buf,
+                self.active_mask_full_buf,
+            ) = jax.device_put((scheduled_np, req_num_tokens_np, active_mask_np), self._empty_sharding)
+
+            padded_num_reqs = int(num_reqs_padding_lut[num_reqs])
 
             t_prep = time.time() - t_prep_start
             total_prep_time += t_prep
@@ -622,30 +717,43 @@ class eSurgeRunner:
             sq_utime_took = time.time() - sq_utime
             total_sync_time += sq_utime_took
 
-            # Post-processing - highly optimized
+            # Read back the previous window only now that this one is dispatched, so its
+            # device-to-host copy overlaps with the forward pass just launched.
             up_wtime = time.time()
-
-            # Direct boolean array indexing (fastest)
-            for i, rid in enumerate(req_ids_window):
-                if rid is None:
-                    continue
-                req_ids_all.append(rid)
-
-                if valid_mask_win[i]:
-                    # Direct extraction without conversion overhead
-                    tid = int(out_tokens_win[i])
-                    sampled_token_ids_all.append([tid])
-                    # Only lookup if we need to update
-                    if rid in self.requests:
-                        self.requests[rid].output_token_ids.append(tid)
-                else:
-                    sampled_token_ids_all.append([])
-
-            up_wtime_took = time.time() - up_wtime
-            total_post_proc_time += up_wtime_took
+            while pending_windows:
+                drain_window(*pending_windows.pop())
+            pending_windows.append((out_tokens_win, valid_mask_win, start_index, end_index))
+            total_post_proc_time += time.time() - up_wtime
 
             start_index = end_index
 
+        # Post-processing over every processed window at once
+        up_wtime = time.time()
+        while pending_windows:
+            drain_window(*pending_windows.pop())
+        req_ids_done = self.sequence_buffer.req_ids[:start_index]
+        out_tokens_list = out_tokens_host[:start_index].tolist()
+        valid_rows = np.flatnonzero(valid_mask_host[:start_index]).tolist()
+
+        # Single-token decode: every row yields at most one token, so only valid rows
+        # need a request lookup and everything else is an empty list.
+        sampled_rows: list[list[int]] = [[] for _ in range(start_index)]
+        for i in valid_rows:
+            tid = out_tokens_list[i]
+            sampled_rows[i] = [tid]
+            req_state = self.requests.get(req_ids_done[i])
+            if req_state is not None:
+                req_state.output_token_ids.append(tid)
+
+        if None in req_ids_done:
+            present = [i for i, rid in enumerate(req_ids_done) if rid is not None]
+            req_ids_all = [req_ids_done[i] for i in present]
+            sampled_token_ids_all = [sampled_rows[i] for i in present]
+        else:
+            req_ids_all = req_ids_done
+            sampled_token_ids_all = sampled_rows
+        total_post_proc_time += time.time() - up_wtime
+
         # kv_pages and rng_key are already updated inside executor_manager
 
         metrics_collector = get_metrics_collector()
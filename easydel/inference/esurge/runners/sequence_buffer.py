@@ -37,9 +37,11 @@ Example:
 from __future__ import annotations
 
 from dataclasses import replace
+from enum import IntEnum
 from typing import Any, cast
 
 import jax
+import numpy as np
 from eformer.loggings import get_logger
 from eformer.pytree import auto_pytree, field
 from jax import numpy as jnp
@@ -75,14 +77,14 @@ def pack_prompts(token_ids, num_prompt_tokens, padded_num_reqs, padded_prompt_le
 
     Note:
         This function is JIT-compiled with static arguments for padded dimensions
-        to enable efficient compilation caching.
+        to enable efficient compilation caching. The copy and pad are a single
+        elementwise select against a broadcast scalar, so no [B, T] padding
+        matrix or materialized position array is built.
     """
     slice_tokens = token_ids[:padded_num_reqs, :padded_prompt_len]
     lengths = num_prompt_tokens[:padded_num_reqs, None]  # [B,1]
-    arange = jnp.arange(padded_prompt_len, dtype=lengths.dtype)[None, :]  # [1,T]
-    mask = arange < lengths  # [B,T]
-    pad_mat = jnp.full_like(slice_tokens, pad_id)
-    return jnp.where(mask, slice_tokens, pad_mat)
+    positions = jax.lax.broadcasted_iota(lengths.dtype, slice_tokens.shape, 1)  # [B,T]
+    return jnp.where(positions < lengths, slice_tokens, jnp.asarray(pad_id, dtype=slice_tokens.dtype))
 
 
 @ejit(static_argnames=("padded_num_reqs",))
@@ -109,11 +111,13 @@ def build_sampling_arrays(temperature, min_p, top_p, top_k, num_reqs, padded_num
 
     Note:
         Default padding values are chosen to be neutral for sampling operations.
+        Only the first padded_num_reqs rows are read, and num_reqs is traced so
+        a single executable serves every batch size within a padding bucket.
     """
+    valid = jnp.arange(padded_num_reqs) < num_reqs
 
     def fill(arr, fill_val):
-        out = jnp.full((padded_num_reqs,), fill_val, dtype=arr.dtype)
-        return out.at[:num_reqs].set(arr[:num_reqs])
+        return jnp.where(valid, arr[:padded_num_reqs], jnp.asarray(fill_val, dtype=arr.dtype))
 
     return (
         fill(temperature, -1.0).astype(jnp.float32),
@@ -136,14 +140,15 @@ def swap_rows(arr, i1, i2):
         Array with rows i1 and i2 swapped.
 
     Note:
-        This function is JIT-compiled for efficient execution.
+        This function is JIT-compiled for efficient execution. Only the two
+        rows are gathered and scattered back, rather than permuting the whole
+        array through a full-size gather.
     """
-    idx = jnp.arange(arr.shape[0])
-    idx = idx.at[i1].set(i2)
-    idx = idx.at[i2].set(i1)
-    return arr[idx]
+    rows = jnp.stack([i1, i2])
+    return arr.at[rows].set(arr[rows[::-1]])
 
 
+@ejit
 def swap_rows_pytree(arrs, i1, i2):
     """Swap rows across all arrays in a pytree.
 
@@ -154,8 +159,15 @@ def swap_rows_pytree(arrs, i1, i2):
 
     Returns:
         PyTree with same structure but rows swapped in all arrays.
+
+    Note:
+        All leaves are handled by one compiled call, so swapping every
+        per-request column costs a single dispatch. Each leaf only reads and
+        writes the two affected rows (e.g. 2 x max_model_len tokens for
+        token_ids) instead of being permuted through a full-size gather.
     """
-    return jax.tree_map(lambda a: swap_rows(a, i1, i2), arrs)
+    rows = jnp.stack([i1, i2])
+    return jax.tree_util.tree_map(lambda a: a.at[rows].set(a[rows[::-1]]), arrs)
 
 
 @ejit
@@ -176,6 +188,108 @@ def move_row(arr, from_idx, to_idx):
     return arr.at[to_idx].set(arr[from_idx])
 
 
+@ejit
+def move_rows(arrs, from_idx, to_idx):
+    """Move several rows at once across all arrays in a pytree.
+
+    Args:
+        arrs: Array or PyTree of arrays sharing the leading request axis.
+        from_idx: Source row indices [K].
+        to_idx: Destination row indices [K], disjoint from from_idx.
+
+    Returns:
+        Same structure with every from_idx row copied to its to_idx row.
+    """
+    return jax.tree_util.tree_map(lambda a: a.at[to_idx].set(a[from_idx]), arrs)
+
+
+# Per-request array columns that are moved/swapped together as one pytree
+_ROW_FIELDS = (
+    "token_ids",
+    "num_tokens",
+    "num_tokens_no_spec",
+    "num_prompt_tokens",
+    "num_computed_tokens",
+    "temperature",
+    "top_p",
+    "top_k",
+    "min_p",
+    "frequency_penalties",
+    "presence_penalties",
+    "repetition_penalties",
+    "allowed_token_ids_mask",
+)
+
+
+class _SamplingFlag(IntEnum):
+    """Rows of SequenceBuffer._flags, one per tracked sampling feature or optional parameter."""
+
+    GREEDY = 0
+    RANDOM = 1
+    TOP_P = 2
+    TOP_K = 3
+    MIN_P = 4
+    FREQUENCY_PENALTY = 5
+    PRESENCE_PENALTY = 6
+    REPETITION_PENALTY = 7
+    ALLOWED_TOKEN_IDS = 8
+    MIN_TOKENS = 9
+    BAD_WORDS = 10
+    LOGIT_BIAS = 11
+
+
+_PENALTY_FLAGS = [
+    _SamplingFlag.FREQUENCY_PENALTY,
+    _SamplingFlag.PRESENCE_PENALTY,
+    _SamplingFlag.REPETITION_PENALTY,
+]
+
+# Optional per-request parameters kept in Python containers keyed by request index
+_SPARSE_FLAGS = [
+    _SamplingFlag.MIN_TOKENS,
+    _SamplingFlag.BAD_WORDS,
+    _SamplingFlag.LOGIT_BIAS,
+]
+
+
+def _has_optional_params(request: EngineRequest, sampling_params: SamplingParams) -> bool:
+    """Whether a request sets any parameter handled by SequenceBuffer._process_optional_params()."""
+    return bool(
+        sampling_params.min_tokens
+        or sampling_params.logprobs is not None
+        or sampling_params.prompt_logprobs is not None
+        or sampling_params.logit_bias is not None
+        or sampling_params.allowed_token_ids
+        or sampling_params.bad_words_token_ids
+        or getattr(request, "generator_seed", None) is not None
+    )
+
+
+def _empty_flags() -> np.ndarray:
+    return np.zeros((len(_SamplingFlag), 0), dtype=bool)
+
+
+_MASK_WORD_BITS = 32
+
+
+@ejit(static_argnames=("vocab_size",))
+def unpack_allowed_token_ids_mask(packed_mask, vocab_size):
+    """Expand a bit-packed allowed-token mask to a boolean mask.
+
+    Args:
+        packed_mask: uint32 words [B, ceil(vocab_size / 32)] as stored in
+            SequenceBuffer.allowed_token_ids_mask.
+        vocab_size: Total vocabulary size.
+
+    Returns:
+        Boolean mask of shape [B, vocab_size] where True indicates the token is
+        disallowed, matching build_allowed_mask().
+    """
+    token = jnp.arange(vocab_size, dtype=jnp.uint32)
+    words = packed_mask[:, token // _MASK_WORD_BITS]
+    return ((words >> (token % _MASK_WORD_BITS)) & 1).astype(bool)
+
+
 @ejit(static_argnames=("vocab_size", "max_allowed"))
 def build_allowed_mask(allowed_ids_padded, allowed_lens, vocab_size, max_allowed):
     """Build a mask for allowed token IDs.
@@ -254,24 +368,26 @@ class SequenceBuffer:
     # Python bookkeeping (non-leaves)
     _req_ids: list[str | None] = field(default_factory=list, pytree_node=False)
     req_id_to_index: dict[str, int] = field(default_factory=dict, pytree_node=False)
+    _num_reqs: int = field(default=0, pytree_node=False)
+    # One past the highest slot written since the last clear(); 0 means every slot is pristine
+    _dirty_upto: int = field(default=0, pytree_node=False)
     req_output_token_ids: list[list[int] | None] = field(default_factory=list, pytree_node=False)
 
-    greedy_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    random_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    top_p_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    top_k_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    min_p_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    frequency_penalties_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    presence_penalties_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    repetition_penalties_reqs: set[str] = field(default_factory=set, pytree_node=False)
-    has_allowed_token_ids: set[str] = field(default_factory=set, pytree_node=False)
+    # Host-side sampling flags [len(_SamplingFlag), max_num_reqs] (non-leaf), indexed by request index
+    _flags: np.ndarray = field(default_factory=_empty_flags, pytree_node=False)
+    # Host-side liveness [max_num_reqs] (non-leaf): True where the slot holds a request
+    _slot_live: np.ndarray = field(default_factory=lambda: np.zeros((0,), dtype=bool), pytree_node=False)
+    # Host mirror of num_prompt_tokens [max_num_reqs] (non-leaf), so prompt sizing needs no device sync
+    _prompt_lens: np.ndarray = field(default_factory=lambda: np.zeros((0,), dtype=np.int32), pytree_node=False)
 
     min_tokens: dict[int, tuple[int, set[int]]] = field(default_factory=dict, pytree_node=False)
-    generator_seeds: dict[int, int] = field(default_factory=dict, pytree_node=False)
+    # Per-slot generator seed [max_num_reqs] (non-leaf); -1 marks "no seed"
+    generator_seeds: np.ndarray = field(default_factory=lambda: np.zeros((0,), dtype=np.int64), pytree_node=False)
     num_logprobs: dict[str, int] = field(default_factory=dict, pytree_node=False)
     num_prompt_logprobs: dict[str, int] = field(default_factory=dict, pytree_node=False)
     in_progress_prompt_logprobs_cpu: dict[str, LogprobsTensors] = field(default_factory=dict, pytree_node=False)
-    logit_bias: list[dict[int, float] | None] = field(default_factory=list, pytree_node=False)
+    # req_index -> (token ids int32 [K], bias values float32 [K])
+    logit_bias: dict[int, tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, pytree_node=False)
     bad_words_token_ids: dict[int, list[list[int]]] = field(default_factory=dict, pytree_node=False)
     allowed_token_ids_mask: Any = None  # jax.Array | None
 
@@ -347,7 +463,10 @@ class SequenceBuffer:
             presence_penalties=presence_penalties,
             repetition_penalties=repetition_penalties,
             page_table=page_table,
-            logit_bias=[None] * max_num_reqs,
+            _flags=np.zeros((len(_SamplingFlag), max_num_reqs), dtype=bool),
+            _slot_live=np.zeros((max_num_reqs,), dtype=bool),
+            _prompt_lens=np.zeros((max_num_reqs,), dtype=np.int32),
+            generator_seeds=np.full((max_num_reqs,), -1, dtype=np.int64),
         )
 
     @property
@@ -356,35 +475,31 @@ class SequenceBuffer:
 
     @property
     def num_reqs(self) -> int:
-        return len(self.req_id_to_index)
+        return self._num_reqs
 
     @property
     def all_greedy(self) -> bool:
-        return len(self.random_reqs) == 0
+        return not self._flags[_SamplingFlag.RANDOM].any()
 
     @property
     def all_random(self) -> bool:
-        return len(self.greedy_reqs) == 0
+        return not self._flags[_SamplingFlag.GREEDY].any()
 
     @property
     def no_top_p(self) -> bool:
-        return len(self.top_p_reqs) == 0
+        return not self._flags[_SamplingFlag.TOP_P].any()
 
     @property
     def no_top_k(self) -> bool:
-        return len(self.top_k_reqs) == 0
+        return not self._flags[_SamplingFlag.TOP_K].any()
 
     @property
     def no_min_p(self) -> bool:
-        return len(self.min_p_reqs) == 0
+        return not self._flags[_SamplingFlag.MIN_P].any()
 
     @property
     def no_penalties(self) -> bool:
-        return (
-            len(self.presence_penalties_reqs) == 0
-            and len(self.frequency_penalties_reqs) == 0
-            and len(self.repetition_penalties_reqs) == 0
-        )
+        return not self._penalties_mask().any()
 
     @property
     def max_num_logprobs(self) -> int | None:
@@ -396,19 +511,15 @@ class SequenceBuffer:
 
     @property
     def no_allowed_token_ids(self) -> bool:
-        return len(self.has_allowed_token_ids) == 0
+        return not self._flags[_SamplingFlag.ALLOWED_TOKEN_IDS].any()
 
-    def _ensure_logit_bias_capacity(self, upto_idx: int) -> None:
-        """Ensure logit_bias list has sufficient capacity.
+    def _penalties_mask(self) -> np.ndarray:
+        """Per-slot mask of requests using any frequency, presence or repetition penalty."""
+        return self._flags[_PENALTY_FLAGS].any(axis=0)
 
-        Args:
-            upto_idx: Index that needs to be accessible.
-
-        Note:
-            Extends the list with None values if needed.
-        """
-        if len(self.logit_bias) <= upto_idx:
-            self.logit_bias.extend([None] * (upto_idx + 1 - len(self.logit_bias)))
+    def _row_arrays(self) -> dict[str, Any]:
+        """Per-request array columns, keyed by field name, for batched row moves/swaps."""
+        return {name: getattr(self, name) for name in _ROW_FIELDS}
 
     def add_request(self, request: EngineRequest, req_index: int | None = None) -> SequenceBuffer:
         """Add a new request to the buffer.
@@ -435,63 +546,135 @@ class SequenceBuffer:
 
         Note:
             This method is functional and returns a new buffer instance
-            rather than modifying in place.
+            rather than modifying in place. It is a single-request shortcut
+            for add_requests().
         """
-        req_id = request.req_id
-        if req_id in self.req_id_to_index:
-            raise ValueError(f"Request ID {req_id} is already present at index {self.req_id_to_index[req_id]}.")
+        return self.add_requests([request], [req_index])
 
-        req_index = self._allocate_index(req_index)
+    def add_requests(
+        self,
+        requests: list[EngineRequest],
+        req_indices: list[int | None] | None = None,
+    ) -> SequenceBuffer:
+        """Add a batch of new requests to the buffer.
 
-        if req_index == len(self._req_ids):
-            self._req_ids.append(req_id)
-            self.req_output_token_ids.append(request.output_token_ids)
-        else:
-            self._req_ids[req_index] = req_id
-            self.req_output_token_ids[req_index] = request.output_token_ids
-        self.req_id_to_index[req_id] = req_index
-
-        # Copy tokens into arrays (functional)
-        num_prompt_tokens = min(len(request.prompt_token_ids), self.max_model_len)
-        new_num_prompt_tokens = self.num_prompt_tokens.at[req_index].set(num_prompt_tokens)
-        new_token_ids = self.token_ids.at[req_index, :num_prompt_tokens].set(
-            jnp.array(request.prompt_token_ids[:num_prompt_tokens], dtype=jnp.int32)
-        )
+        Python bookkeeping (ids, tracking sets, sparse parameters) is done per
+        request, while token rows, counters and sampling parameters are staged
+        column-wise on the host and written with one scatter per array. The
+        whole batch is validated and its slots are assigned before anything is
+        written, so a rejected batch leaves the buffer unchanged.
 
-        if request.output_token_ids:
-            start_idx = num_prompt_tokens
-            max_output_tokens = self.max_model_len - num_prompt_tokens
-            output_tokens_to_copy = request.output_token_ids[:max_output_tokens]
-            if output_tokens_to_copy:
-                end_idx = min(start_idx + len(output_tokens_to_copy), self.max_model_len)
-                new_token_ids = new_token_ids.at[req_index, start_idx:end_idx].set(
-                    jnp.array(output_tokens_to_copy, dtype=jnp.int32)
-                )
-
-        capped_num_tokens = min(int(request.num_tokens), self.max_model_len)
-        new_num_tokens = self.num_tokens.at[req_index].set(capped_num_tokens)
-        new_num_tokens_no_spec = self.num_tokens_no_spec.at[req_index].set(capped_num_tokens)
-        new_num_computed_tokens = self.num_computed_tokens.at[req_index].set(
-            min(int(request.num_computed_tokens), self.max_model_len)
-        )
+        Args:
+            requests: Engine requests to add (see add_request()).
+            req_indices: Optional target index per request. None entries, or
+                omitting the list, place the request in the next available slot.
+
+        Returns:
+            A new SequenceBuffer instance with all requests added.
 
+        Raises:
+            ValueError: If a request ID already exists in the buffer or repeats
+                within the batch, a req_index is occupied or repeated, or
+                allowed_token_ids fall outside the vocabulary.
+            IndexError: If a req_index is out of bounds.
+            RuntimeError: If the buffer is full.
+        """
+        num_new = len(requests)
+        if num_new == 0:
+            return self
+        if req_indices is None:
+            req_indices = [None] * num_new
+
+        seen: set[str] = set()
+        for request in requests:
+            req_id = request.req_id
+            if req_id in self.req_id_to_index:
+                raise ValueError(f"Request ID {req_id} is already present at index {self.req_id_to_index[req_id]}.")
+            if req_id in seen:
+                raise ValueError(f"Request ID {req_id} appears more than once in the batch.")
+            seen.add(req_id)
+            sampling_params = request.sampling_params
+            assert sampling_params is not None, "pooling requests not supported yet"
+            if sampling_params.allowed_token_ids:
+                ids = np.asarray(sampling_params.allowed_token_ids, dtype=np.int64)
+                if ids.min() < 0 or ids.max() >= self.vocab_size:
+                    raise ValueError(f"allowed_token_ids must be within [0, {self.vocab_size})")
+        indices = self._allocate_indices(req_indices)
+
+        token_rows = np.zeros((num_new, self.max_model_len), dtype=np.int32)
+        num_prompt_tokens = np.empty(num_new, dtype=np.int32)
+        num_tokens = np.empty(num_new, dtype=np.int32)
+        num_computed_tokens = np.empty(num_new, dtype=np.int32)
+        temperature = np.empty(num_new, dtype=np.float32)
+        top_p = np.empty(num_new, dtype=np.float32)
+        top_k = np.empty(num_new, dtype=np.int32)
+        min_p = np.empty(num_new, dtype=np.float32)
+        frequency_penalties = np.empty(num_new, dtype=np.float32)
+        presence_penalties = np.empty(num_new, dtype=np.float32)
+        repetition_penalties = np.empty(num_new, dtype=np.float32)
+
+        for i, (request, req_index) in enumerate(zip(requests, indices.tolist(), strict=True)):
+            req_id = request.req_id
+            while len(self._req_ids) < req_index:
+                self._req_ids.append(None)
+                self.req_output_token_ids.append(None)
+            if req_index == len(self._req_ids):
+                self._req_ids.append(req_id)
+                self.req_output_token_ids.append(request.output_token_ids)
+            else:
+                self._req_ids[req_index] = req_id
+                self.req_output_token_ids[req_index] = request.output_token_ids
+            self.req_id_to_index[req_id] = req_index
+            self._slot_live[req_index] = True
+
+            # Prompt followed by any already generated tokens, truncated to max_model_len
+            prompt = request.prompt_token_ids[: self.max_model_len]
+            prompt_len = len(prompt)
+            token_rows[i, :prompt_len] = prompt
+            if request.output_token_ids:
+                outputs = request.output_token_ids[: self.max_model_len - prompt_len]
+                token_rows[i, prompt_len : prompt_len + len(outputs)] = outputs
+
+            num_prompt_tokens[i] = prompt_len
+            num_tokens[i] = min(int(request.num_tokens), self.max_model_len)
+            num_computed_tokens[i] = min(int(request.num_computed_tokens), self.max_model_len)
+
+            sampling_params = request.sampling_params
+            (
+                temperature[i],
+                top_p[i],
+                top_k[i],
+                min_p[i],
+                frequency_penalties[i],
+                presence_penalties[i],
+                repetition_penalties[i],
+            ) = self._register_sampling_params(sampling_params, req_index)
+
+        self._prompt_lens[indices] = num_prompt_tokens
+        idx = jnp.asarray(indices)
         buf = replace(
             self,
-            token_ids=new_token_ids,
-            num_prompt_tokens=new_num_prompt_tokens,
-            num_tokens=new_num_tokens,
-            num_tokens_no_spec=new_num_tokens_no_spec,
-            num_computed_tokens=new_num_computed_tokens,
+            token_ids=self.token_ids.at[idx].set(token_rows),
+            num_prompt_tokens=self.num_prompt_tokens.at[idx].set(num_prompt_tokens),
+            num_tokens=self.num_tokens.at[idx].set(num_tokens),
+            num_tokens_no_spec=self.num_tokens_no_spec.at[idx].set(num_tokens),
+            num_computed_tokens=self.num_computed_tokens.at[idx].set(num_computed_tokens),
+            temperature=self.temperature.at[idx].set(temperature),
+            top_p=self.top_p.at[idx].set(top_p),
+            top_k=self.top_k.at[idx].set(top_k),
+            min_p=self.min_p.at[idx].set(min_p),
+            frequency_penalties=self.frequency_penalties.at[idx].set(frequency_penalties),
+            presence_penalties=self.presence_penalties.at[idx].set(presence_penalties),
+            repetition_penalties=self.repetition_penalties.at[idx].set(repetition_penalties),
+            _num_reqs=self._num_reqs + num_new,
+            _dirty_upto=max(self._dirty_upto, int(indices.max()) + 1),
+            page_table=self.page_table.add_rows_batch([request.page_ids for request in requests], indices.tolist()),
         )
 
-        # Page table
-        buf = replace(buf, page_table=buf.page_table.add_row(request.page_ids, req_index))
-
-        # Sampling params
-        sampling_params = request.sampling_params
-        assert sampling_params is not None, "pooling requests not supported yet"
-        buf = buf._process_sampling_params(sampling_params, req_id, req_index)
-        buf = buf._process_optional_params(request, sampling_params, req_id, req_index)
+        # Plain sampling requests (the common case) carry no optional state at all
+        for request, req_index in zip(requests, indices.tolist(), strict=True):
+            if _has_optional_params(request, request.sampling_params):
+                buf = buf._process_optional_params(request, request.sampling_params, request.req_id, req_index)
         return buf
 
     def remove_request(self, req_id: str) -> tuple[SequenceBuffer, int | None]:
@@ -520,35 +703,23 @@ class SequenceBuffer:
         self._req_ids[req_index] = None
         self.req_output_token_ids[req_index] = None
 
-        for req_set in [
-            self.greedy_reqs,
-            self.random_reqs,
-            self.top_p_reqs,
-            self.top_k_reqs,
-            self.min_p_reqs,
-            self.frequency_penalties_reqs,
-            self.presence_penalties_reqs,
-            self.repetition_penalties_reqs,
-            self.has_allowed_token_ids,
-        ]:
-            req_set.discard(req_id)
+        self._flags[:, req_index] = False
+        self._slot_live[req_index] = False
+        self._prompt_lens[req_index] = 0
 
         self.min_tokens.pop(req_index, None)
-        self.generator_seeds.pop(req_index, None)
+        self.generator_seeds[req_index] = -1
         self.num_logprobs.pop(req_id, None)
         self.num_prompt_logprobs.pop(req_id, None)
         self.in_progress_prompt_logprobs_cpu.pop(req_id, None)
         self.bad_words_token_ids.pop(req_index, None)
-
-        # Guarded indexing
-        self._ensure_logit_bias_capacity(req_index)
-        self.logit_bias[req_index] = None
+        self.logit_bias.pop(req_index, None)
 
         new_mask = self.allowed_token_ids_mask
         if new_mask is not None:
-            new_mask = new_mask.at[req_index].set(False)
+            new_mask = new_mask.at[req_index].set(0)
 
-        return replace(self, allowed_token_ids_mask=new_mask), req_index
+        return replace(self, allowed_token_ids_mask=new_mask, _num_reqs=self._num_reqs - 1), req_index
 
     def swap_states(self, i1: int, i2: int) -> SequenceBuffer:
         """Swap the states of two requests at given indices.
@@ -580,46 +751,23 @@ class SequenceBuffer:
         self.req_id_to_index[old_id_i1] = i2
         self.req_id_to_index[old_id_i2] = i1
 
-        # Swap arrays
-        new_num_tokens = swap_rows(self.num_tokens, i1, i2)
-        new_num_tokens_no_spec = swap_rows(self.num_tokens_no_spec, i1, i2)
-        new_num_prompt_tokens = swap_rows(self.num_prompt_tokens, i1, i2)
-        new_num_computed_tokens = swap_rows(self.num_computed_tokens, i1, i2)
-        new_temperature = swap_rows(self.temperature, i1, i2)
-        new_top_p = swap_rows(self.top_p, i1, i2)
-        new_top_k = swap_rows(self.top_k, i1, i2)
-        new_frequency_penalties = swap_rows(self.frequency_penalties, i1, i2)
-        new_presence_penalties = swap_rows(self.presence_penalties, i1, i2)
-        new_repetition_penalties = swap_rows(self.repetition_penalties, i1, i2)
-        new_min_p = swap_rows(self.min_p, i1, i2)
-        new_token_ids = swap_rows(self.token_ids, i1, i2)
+        # Swap all per-request columns in one call
+        swapped = swap_rows_pytree(self._row_arrays(), i1, i2)
 
-        new_mask = self.allowed_token_ids_mask
-        if new_mask is not None:
-            new_mask = swap_rows(new_mask, i1, i2)
+        # Optional parameters are only touched when either request carries them
+        present = self._flags[:, [i1, i2]].any(axis=1)
+        self._flags[:, [i1, i2]] = self._flags[:, [i2, i1]]
+        self._prompt_lens[[i1, i2]] = self._prompt_lens[[i2, i1]]
+        self.generator_seeds[[i1, i2]] = self.generator_seeds[[i2, i1]]
 
-        swap_dict_values(self.generator_seeds, i1, i2)
-        swap_dict_values(self.min_tokens, i1, i2)
-        swap_dict_values(self.bad_words_token_ids, i1, i2)
-        self.logit_bias[i1], self.logit_bias[i2] = self.logit_bias[i2], self.logit_bias[i1]
+        if present[_SamplingFlag.MIN_TOKENS]:
+            swap_dict_values(self.min_tokens, i1, i2)
+        if present[_SamplingFlag.BAD_WORDS]:
+            swap_dict_values(self.bad_words_token_ids, i1, i2)
+        if present[_SamplingFlag.LOGIT_BIAS]:
+            swap_dict_values(self.logit_bias, i1, i2)
 
-        return replace(
-            self,
-            num_tokens=new_num_tokens,
-            num_tokens_no_spec=new_num_tokens_no_spec,
-            num_prompt_tokens=new_num_prompt_tokens,
-            num_computed_tokens=new_num_computed_tokens,
-            temperature=new_temperature,
-            top_p=new_top_p,
-            top_k=new_top_k,
-            frequency_penalties=new_frequency_penalties,
-            presence_penalties=new_presence_penalties,
-            repetition_penalties=new_repetition_penalties,
-            min_p=new_min_p,
-            token_ids=new_token_ids,
-            page_table=self.page_table.swap_row(i1, i2),
-            allowed_token_ids_mask=new_mask,
-        )
+        return replace(self, **swapped, page_table=self.page_table.swap_row(i1, i2))
 
     def condense(self, empty_req_indices: list[int]) -> SequenceBuffer:
         """Condense the buffer by removing gaps.
@@ -645,18 +793,23 @@ class SequenceBuffer:
             buf.req_output_token_ids.clear()
             return buf
 
+        # Plan all moves first (tail requests into holes), then apply them in one batch
+        empty = set(empty_req_indices)
         last_req_index = num_reqs + len(empty_req_indices) - 1
-
+        from_idxs: list[int] = []
+        to_idxs: list[int] = []
         for empty_index in reversed(empty_req_indices):
-            while last_req_index in empty_req_indices and last_req_index > empty_index:
+            while last_req_index in empty and last_req_index > empty_index:
                 last_req_index -= 1
             if empty_index >= last_req_index:
                 continue
-            buf = buf._move_request(last_req_index, empty_index)
+            from_idxs.append(last_req_index)
+            to_idxs.append(empty_index)
             last_req_index -= 1
 
-        del buf._req_ids[buf.num_reqs :]
-        del buf.req_output_token_ids[buf.num_reqs :]
+        buf = buf._move_requests(from_idxs, to_idxs)
+        del buf._req_ids[num_reqs:]
+        del buf.req_output_token_ids[num_reqs:]
         return buf
 
     def _move_request(self, from_idx: int, to_idx: int) -> SequenceBuffer:
@@ -678,157 +831,151 @@ class SequenceBuffer:
             This is an internal method used by condense() and other
             buffer reorganization operations.
         """
-        req_id = self._req_ids[from_idx]
-        assert req_id is not None
+        return self._move_requests([from_idx], [to_idx])
+
+    def _move_requests(self, from_idxs: list[int], to_idxs: list[int]) -> SequenceBuffer:
+        """Move several requests at once.
+
+        Python bookkeeping is updated per request; every array is then updated
+        with a single batched row move.
+
+        Args:
+            from_idxs: Source indices, each holding a valid request.
+            to_idxs: Destination indices, one per source and disjoint from the sources.
 
-        # Static bookkeeping
-        self._req_ids[to_idx] = req_id
-        self._req_ids[from_idx] = None
-        self.req_output_token_ids[to_idx] = self.req_output_token_ids[from_idx]
-        self.req_output_token_ids[from_idx] = None
-        self.req_id_to_index[req_id] = to_idx
+        Returns:
+            A new SequenceBuffer with the requests moved.
+
+        Raises:
+            AssertionError: If a source index doesn't contain a valid request.
+        """
+        if not from_idxs:
+            return self
+
+        frm_host = np.asarray(from_idxs, dtype=np.int32)
+        to_host = np.asarray(to_idxs, dtype=np.int32)
+        has_sparse = self._flags[_SPARSE_FLAGS][:, frm_host].any(axis=0)
+        has_allowed_token_ids = self._flags[_SamplingFlag.ALLOWED_TOKEN_IDS, frm_host].any()
+
+        for from_idx, to_idx, sparse in zip(from_idxs, to_idxs, has_sparse, strict=True):
+            req_id = self._req_ids[from_idx]
+            assert req_id is not None
+
+            # Static bookkeeping
+            self._req_ids[to_idx] = req_id
+            self._req_ids[from_idx] = None
+            self.req_output_token_ids[to_idx] = self.req_output_token_ids[from_idx]
+            self.req_output_token_ids[from_idx] = None
+            self.req_id_to_index[req_id] = to_idx
+            if sparse:
+                self._move_sparse_data(from_idx, to_idx)
+
+        self._flags[:, to_host] = self._flags[:, frm_host]
+        self._flags[:, frm_host] = False
+        self._slot_live[frm_host] = False
+        self._slot_live[to_host] = True
+        self._prompt_lens[to_host] = self._prompt_lens[frm_host]
+        self._prompt_lens[frm_host] = 0
+        self.generator_seeds[to_host] = self.generator_seeds[frm_host]
+        self.generator_seeds[frm_host] = -1
 
         # Arrays
-        new_token_ids = move_row(self.token_ids, from_idx, to_idx)
-        new_num_tokens = move_row(self.num_tokens, from_idx, to_idx)
-        new_num_tokens_no_spec = move_row(self.num_tokens_no_spec, from_idx, to_idx)
-        new_num_prompt_tokens = move_row(self.num_prompt_tokens, from_idx, to_idx)
-        new_num_computed_tokens = move_row(self.num_computed_tokens, from_idx, to_idx)
-        new_temperature = move_row(self.temperature, from_idx, to_idx)
-        new_top_p = move_row(self.top_p, from_idx, to_idx)
-        new_top_k = move_row(self.top_k, from_idx, to_idx)
-        new_frequency_penalties = move_row(self.frequency_penalties, from_idx, to_idx)
-        new_presence_penalties = move_row(self.presence_penalties, from_idx, to_idx)
-        new_repetition_penalties = move_row(self.repetition_penalties, from_idx, to_idx)
-        new_min_p = move_row(self.min_p, from_idx, to_idx)
-
-        # Page table
-        new_page_table = self.page_table.move_row(from_idx, to_idx)
-
-        # Sparse/optional
-        buf = replace(
-            self,
-            token_ids=new_token_ids,
-            num_tokens=new_num_tokens,
-            num_tokens_no_spec=new_num_tokens_no_spec,
-            num_prompt_tokens=new_num_prompt_tokens,
-            num_computed_tokens=new_num_computed_tokens,
-            temperature=new_temperature,
-            top_p=new_top_p,
-            top_k=new_top_k,
-            frequency_penalties=new_frequency_penalties,
-            presence_penalties=new_presence_penalties,
-            repetition_penalties=new_repetition_penalties,
-            min_p=new_min_p,
-            page_table=new_page_table,
-        )
-        return buf._move_sparse_data(from_idx, to_idx)
+        frm = jnp.asarray(frm_host)
+        to = jnp.asarray(to_host)
+
+        arrays = self._row_arrays()
+        if not has_allowed_token_ids:
+            # Source rows are all zero and destinations were zeroed on removal
+            del arrays["allowed_token_ids_mask"]
+        moved = move_rows(arrays, frm, to)
+        if moved.get("allowed_token_ids_mask") is not None:
+            moved["allowed_token_ids_mask"] = moved["allowed_token_ids_mask"].at[frm].set(0)
 
-    def _move_sparse_data(self, from_idx: int, to_idx: int) -> SequenceBuffer:
+        return replace(self, **moved, page_table=self.page_table.move_rows(from_idxs, to_idxs))
+
+    def _move_sparse_data(self, from_idx: int, to_idx: int) -> None:
         """Move sparse and optional data between indices.
 
         Handles the movement of data that may not exist for all requests,
-        such as generator seeds, min_tokens, bad words, etc.
+        such as min_tokens, bad words and logit bias.
 
         Args:
             from_idx: Source index.
-            to_idx: Destination index.
-
-        Returns:
-            A new SequenceBuffer with sparse data moved.
+            to_idx: Destination index, an empty slot.
 
         Note:
-            This method complements _move_request() by handling
-            optional parameters that aren't stored in the main arrays.
+            This method complements _move_requests() by handling optional
+            parameters that aren't stored in the main arrays. These live in
+            Python containers and are updated in place; the allowed-token mask
+            is moved together with the other arrays in _move_requests().
+            Only the containers flagged for the source slot in _flags are
+            touched, and it must be called before the flags themselves move.
         """
-        if from_idx in self.generator_seeds:
-            self.generator_seeds[to_idx] = self.generator_seeds.pop(from_idx)
-
-        if from_idx in self.min_tokens:
+        flags = self._flags[:, from_idx]
+        if flags[_SamplingFlag.MIN_TOKENS]:
             self.min_tokens[to_idx] = self.min_tokens.pop(from_idx)
 
-        if from_idx in self.bad_words_token_ids:
+        if flags[_SamplingFlag.BAD_WORDS]:
             self.bad_words_token_ids[to_idx] = self.bad_words_token_ids.pop(from_idx)
 
-        self.logit_bias[to_idx] = self.logit_bias[from_idx]
-        self.logit_bias[from_idx] = None
-
-        new_mask = self.allowed_token_ids_mask
-        if new_mask is not None:
-            new_mask = new_mask.at[to_idx].set(new_mask[from_idx])
-            new_mask = new_mask.at[from_idx].set(False)
+        if flags[_SamplingFlag.LOGIT_BIAS]:
+            self.logit_bias[to_idx] = self.logit_bias.pop(from_idx)
 
-        return replace(self, allowed_token_ids_mask=new_mask)
-
-    def _process_sampling_params(self, sampling_params: SamplingParams, req_id: str, req_index: int) -> SequenceBuffer:
-        """Process and store core sampling parameters.
+    def _register_sampling_params(
+        self,
+        sampling_params: SamplingParams,
+        req_index: int,
+    ) -> tuple[float, float, int, float, float, float, float]:
+        """Track a request's sampling strategy and resolve its parameter row.
 
-        Updates arrays with sampling configuration like temperature, top_p, top_k, etc.
-        Also maintains sets tracking which requests use which sampling strategies.
+        Sets the per-slot flags tracking which requests use which sampling
+        strategies and returns the values to store in the sampling arrays.
 
         Args:
             sampling_params: Sampling configuration containing temperature, top_p, etc.
-            req_id: Request identifier for bookkeeping.
-            req_index: Index where parameters should be stored.
+            req_index: Index of the request's slot.
 
         Returns:
-            A new SequenceBuffer with updated sampling parameters.
+            Tuple of (temperature, top_p, top_k, min_p, frequency_penalty,
+            presence_penalty, repetition_penalty) for the request's row.
 
         Note:
-            Maintains separate tracking sets for different sampling strategies
-            to enable optimized execution paths.
+            Greedy requests store a temperature of -1.0 and top_k outside
+            (0, vocab_size) is stored as vocab_size (disabled).
         """
-        temperature = self.temperature
-        top_p = self.top_p
-        top_k = self.top_k
-        min_p = self.min_p
-        frequency_penalties = self.frequency_penalties
-        presence_penalties = self.presence_penalties
-        repetition_penalties = self.repetition_penalties
-
         if sampling_params.sampling_type == SamplingType.GREEDY:
-            temperature = temperature.at[req_index].set(-1.0)
-            self.greedy_reqs.add(req_id)
+            temperature = -1.0
+            self._flags[_SamplingFlag.GREEDY, req_index] = True
         else:
-            temperature = temperature.at[req_index].set(sampling_params.temperature)
-            self.random_reqs.add(req_id)
+            temperature = sampling_params.temperature
+            self._flags[_SamplingFlag.RANDOM, req_index] = True
 
-        top_p = top_p.at[req_index].set(sampling_params.top_p)
         if sampling_params.top_p < 1:
-            self.top_p_reqs.add(req_id)
+            self._flags[_SamplingFlag.TOP_P, req_index] = True
 
-        tk = sampling_params.top_k
-        if 0 < tk < self.vocab_size:
-            self.top_k_reqs.add(req_id)
-            top_k = top_k.at[req_index].set(tk)
+        top_k = sampling_params.top_k
+        if 0 < top_k < self.vocab_size:
+            self._flags[_SamplingFlag.TOP_K, req_index] = True
         else:
-            top_k = top_k.at[req_index].set(self.vocab_size)
+            top_k = self.vocab_size
 
-        min_p = min_p.at[req_index].set(sampling_params.min_p)
         if sampling_params.min_p > 1e-5:
-            self.min_p_reqs.add(req_id)
-
+            self._flags[_SamplingFlag.MIN_P, req_index] = True
         if sampling_params.frequency_penalty != 0.0:
-            frequency_penalties = frequency_penalties.at[req_index].set(sampling_params.frequency_penalty)
-            self.frequency_penalties_reqs.add(req_id)
-
+            self._flags[_SamplingFlag.FREQUENCY_PENALTY, req_index] = True
         if sampling_params.presence_penalty != 0.0:
-            presence_penalties = presence_penalties.at[req_index].set(sampling_params.presence_penalty)
-            self.presence_penalties_reqs.add(req_id)
-
+            self._flags[_SamplingFlag.PRESENCE_PENALTY, req_index] = True
         if sampling_params.repetition_penalty != 1.0:
-            repetition_penalties = repetition_penalties.at[req_index].set(sampling_params.repetition_penalty)
-            self.repetition_penalties_reqs.add(req_id)
+            self._flags[_SamplingFlag.REPETITION_PENALTY, req_index] = True
 
-        return replace(
-            self,
-            temperature=temperature,
-            top_p=top_p,
-            top_k=top_k,
-            min_p=min_p,
-            frequency_penalties=frequency_penalties,
-            presence_penalties=presence_penalties,
-            repetition_penalties=repetition_penalties,
+        return (
+            temperature,
+            sampling_params.top_p,
+            top_k,
+            sampling_params.min_p,
+            sampling_params.frequency_penalty,
+            sampling_params.presence_penalty,
+            sampling_params.repetition_penalty,
         )
 
     def _process_optional_params(
@@ -859,6 +1006,7 @@ class SequenceBuffer:
         buf = self
         if sampling_params.min_tokens:
             self.min_tokens[req_index] = (sampling_params.min_tokens, sampling_params.all_stop_token_ids)
+            self._flags[_SamplingFlag.MIN_TOKENS, req_index] = True
 
         if hasattr(request, "generator_seed") and request.generator_seed is not None:
             self.generator_seeds[req_index] = request.generator_seed
@@ -870,27 +1018,29 @@ class SequenceBuffer:
             self.num_prompt_logprobs[req_id] = sampling_params.prompt_logprobs
 
         if sampling_params.logit_bias is not None:
-            if len(self.logit_bias) < self.max_num_reqs:
-                # Ensure list length
-                self.logit_bias.extend([None] * (self.max_num_reqs - len(self.logit_bias)))
-            self.logit_bias[req_index] = sampling_params.logit_bias
+            bias = sampling_params.logit_bias
+            self.logit_bias[req_index] = (
+                np.fromiter(bias.keys(), dtype=np.int32, count=len(bias)),
+                np.fromiter(bias.values(), dtype=np.float32, count=len(bias)),
+            )
+            self._flags[_SamplingFlag.LOGIT_BIAS, req_index] = True
 
         if sampling_params.allowed_token_ids:
-            buf = buf._set_allowed_token_ids(req_id, req_index, sampling_params.allowed_token_ids)
+            buf = buf._set_allowed_token_ids(req_index, sampling_params.allowed_token_ids)
 
         if sampling_params.bad_words_token_ids:
             self.bad_words_token_ids[req_index] = sampling_params.bad_words_token_ids
+            self._flags[_SamplingFlag.BAD_WORDS, req_index] = True
 
         return buf
 
-    def _set_allowed_token_ids(self, req_id: str, req_index: int, allowed_token_ids: list[int]) -> SequenceBuffer:
+    def _set_allowed_token_ids(self, req_index: int, allowed_token_ids: list[int]) -> SequenceBuffer:
         """Set the allowed token IDs for a request.
 
         Creates or updates a mask indicating which tokens are allowed for generation.
-        Uses inverted logic where True means disallowed.
+        Uses inverted logic where a set bit means disallowed.
 
         Args:
-            req_id: Request identifier.
             req_index: Index of the request.
             allowed_token_ids: List of token IDs that are allowed.
 
@@ -901,77 +1051,104 @@ class SequenceBuffer:
             ValueError: If any token ID is outside the valid vocabulary range.
 
         Note:
-            The mask uses inverted logic (True=disallowed) for compatibility
-            with JAX masking operations.
+            The mask is bit-packed into uint32 words of shape
+            [max_num_reqs, ceil(vocab_size / 32)], 8x smaller than a bool mask, and
+            uses inverted logic (set bit = disallowed). Use
+            unpack_allowed_token_ids_mask() to expand it to a bool [B, vocab_size] mask.
         """
-        if any((t < 0 or t >= self.vocab_size) for t in allowed_token_ids):
+        ids = np.asarray(allowed_token_ids, dtype=np.int64)
+        if ids.size and (ids.min() < 0 or ids.max() >= self.vocab_size):
             raise ValueError(f"allowed_token_ids must be within [0, {self.vocab_size})")
 
-        self.has_allowed_token_ids.add(req_id)
+        self._flags[_SamplingFlag.ALLOWED_TOKEN_IDS, req_index] = True
+        num_words = -(-self.vocab_size // _MASK_WORD_BITS)
         mask = self.allowed_token_ids_mask
         if mask is None:
-            mask = jnp.zeros((self.max_num_reqs, self.vocab_size), dtype=bool)
+            mask = jnp.zeros((self.max_num_reqs, num_words), dtype=jnp.uint32)
 
-        # Start with all True (disallowed) for this row, then set allowed ones to False
-        mask = mask.at[req_index].set(True)
-        if allowed_token_ids:
-            mask = mask.at[req_index, allowed_token_ids].set(False)
+        # Start with every bit set (disallowed) for this row, then clear the allowed ones
+        row = np.full(num_words, np.iinfo(np.uint32).max, dtype=np.uint32)
+        np.bitwise_and.at(row, ids // _MASK_WORD_BITS, ~(np.uint32(1) << (ids % _MASK_WORD_BITS).astype(np.uint32)))
+        mask = mask.at[req_index].set(row)
 
         return replace(self, allowed_token_ids_mask=mask)
 
-    def _allocate_index(self, req_index: int | None) -> int:
-        """Allocate an index for a new request.
+    def _allocate_indices(self, req_indices: list[int | None]) -> np.ndarray:
+        """Assign a slot to each new request without modifying the buffer.
 
-        Finds or validates an index position for placing a new request.
+        Finds or validates an index position for every request of a batch, in
+        order, as if the earlier requests had already been placed.
 
         Args:
-            req_index: Optional preferred index. If None, finds next available.
+            req_indices: Preferred index per request. None entries take the
+                next available slot.
 
         Returns:
-            The allocated index.
+            The allocated indices as an int32 array.
 
         Raises:
-            IndexError: If req_index exceeds maximum capacity.
-            ValueError: If req_index is already occupied.
+            IndexError: If a req_index exceeds maximum capacity.
+            ValueError: If a req_index is already occupied or repeated.
             RuntimeError: If buffer is full and no index is available.
 
         Note:
-            This method may extend internal bookkeeping lists as needed.
+            Occupancy is read from a copy of the per-slot liveness mask rather
+            than by scanning _req_ids for None. Slots past the tracked prefix are
+            only counted here; the caller extends the bookkeeping lists.
         """
-        if req_index is not None:
-            if req_index >= self.max_num_reqs:
-                raise IndexError(f"req_index {req_index} >= max_num_reqs {self.max_num_reqs}")
-            while len(self._req_ids) < req_index:
-                self._req_ids.append(None)
-                self.req_output_token_ids.append(None)
-            if req_index < len(self._req_ids) and self._req_ids[req_index] is not None:
-                raise ValueError(f"req_index {req_index} is already occupied by {self._req_ids[req_index]}")
-            return req_index
-
-        for i, rid in enumerate(self._req_ids):
-            if rid is None:
-                return i
-
-        if len(self._req_ids) < self.max_num_reqs:
-            return len(self._req_ids)
-
-        raise RuntimeError("SequenceBuffer is full; cannot allocate a new request index.")
+        live = self._slot_live.copy()
+        tracked = len(self._req_ids)
+        indices = np.empty(len(req_indices), dtype=np.int32)
+        for i, req_index in enumerate(req_indices):
+            if req_index is not None:
+                if req_index >= self.max_num_reqs:
+                    raise IndexError(f"req_index {req_index} >= max_num_reqs {self.max_num_reqs}")
+                if live[req_index]:
+                    owner = self._req_ids[req_index] if self._slot_live[req_index] else "this batch"
+                    raise ValueError(f"req_index {req_index} is already occupied by {owner}")
+            else:
+                # First hole in the tracked prefix, found with one vectorized scan
+                holes = np.flatnonzero(~live[:tracked])
+                if holes.size:
+                    req_index = int(holes[0])
+                elif tracked < self.max_num_reqs:
+                    req_index = tracked
+                else:
+                    raise RuntimeError("SequenceBuffer is full; cannot allocate a new request index.")
+            live[req_index] = True
+            tracked = max(tracked, req_index + 1)
+            indices[i] = req_index
+        return indices
 
     def _make_prompt_token_ids_tensor(self) -> jax.Array:
         """Create a padded tensor of prompt token IDs.
 
         Returns:
-            A padded array of prompt tokens suitable for batch processing.
-            Shape is [num_reqs, max_prompt_len].
+            A padded int32 array of prompt tokens suitable for batch processing.
+            Shape is [num_reqs, max_prompt_len]; padding uses vocab_size.
 
         Note:
-            Uses the JIT-compiled pack_prompts function for efficiency.
+            Uses the JIT-compiled pack_prompts function for efficiency. Its static
+            sizes are rounded up to powers of two so only O(log) variants are ever
+            compiled; the result is sliced back to the exact shape. The longest
+            prompt is read from the host-side prompt lengths, avoiding a device
+            reduction and blocking transfer on every call.
         """
-        if self.num_reqs == 0:
+        num_reqs = self.num_reqs
+        if num_reqs == 0:
             return jnp.empty((0, 0), dtype=jnp.int32)
 
-        max_prompt_len = int(jnp.max(self.num_prompt_tokens[: self.num_reqs]))
-        return pack_prompts(self.token_ids, self.num_prompt_tokens, self.num_reqs, max_prompt_len, self.vocab_size)
+        max_prompt_len = int(self._prompt_lens[:num_reqs].max())
+        padded_num_reqs = min(1 << (num_reqs - 1).bit_length(), self.max_num_reqs)
+        padded_prompt_len = min(1 << max(max_prompt_len - 1, 0).bit_length(), self.max_model_len)
+        packed = pack_prompts(
+            self.token_ids,
+            self.num_prompt_tokens,
+            padded_num_reqs,
+            padded_prompt_len,
+            self.vocab_size,
+        )
+        return packed[:num_reqs, :max_prompt_len]
 
     def get_request_indices_with_penalty(self) -> jax.Array:
         """Get indices of requests with penalties.
@@ -984,12 +1161,8 @@ class SequenceBuffer:
             Used to optimize penalty application by only processing
             requests that actually need it.
         """
-        penalty_req_ids = self.frequency_penalties_reqs | self.presence_penalties_reqs | self.repetition_penalties_reqs
-        if not penalty_req_ids:
-            return jnp.array([], dtype=jnp.int32)
-
-        indices = [self.req_id_to_index[req_id] for req_id in penalty_req_ids]
-        return jnp.array(indices, dtype=jnp.int32)
+        indices = np.flatnonzero(self._penalties_mask()[: len(self._req_ids)]).astype(np.int32)
+        return jnp.asarray(indices)
 
     def get_active_sampling_params(self, req_index: int) -> dict[str, Any]:
         """Get active sampling parameters for a request.
@@ -1004,8 +1177,7 @@ class SequenceBuffer:
         Note:
             Returns empty dict if the index doesn't contain a valid request.
         """
-        req_id = self._req_ids[req_index]
-        if req_id is None:
+        if self._req_ids[req_index] is None:
             return {}
 
         params = {
@@ -1014,13 +1186,13 @@ class SequenceBuffer:
             "top_k": self.top_k[req_index],
         }
 
-        if req_id in self.min_p_reqs:
+        if self._flags[_SamplingFlag.MIN_P, req_index]:
             params["min_p"] = self.min_p[req_index]
-        if req_id in self.frequency_penalties_reqs:
+        if self._flags[_SamplingFlag.FREQUENCY_PENALTY, req_index]:
             params["frequency_penalty"] = self.frequency_penalties[req_index]
-        if req_id in self.presence_penalties_reqs:
+        if self._flags[_SamplingFlag.PRESENCE_PENALTY, req_index]:
             params["presence_penalty"] = self.presence_penalties[req_index]
-        if req_id in self.repetition_penalties_reqs:
+        if self._flags[_SamplingFlag.REPETITION_PENALTY, req_index]:
             params["repetition_penalty"] = self.repetition_penalties[req_index]
 
         return params
@@ -1035,8 +1207,14 @@ class SequenceBuffer:
 
         Note:
             This maintains the buffer structure and capacity but removes
-            all request data.
+            all request data. A buffer that has not been written since it was
+            created or last cleared is returned as is, and host-side state is
+            only reset up to the highest slot that was written.
         """
+        dirty_upto = self._dirty_upto
+        if dirty_upto == 0:
+            return self
+
         self._req_ids.clear()
         self.req_id_to_index.clear()
         self.req_output_token_ids.clear()
@@ -1055,26 +1233,17 @@ class SequenceBuffer:
         presence_penalties = jnp.zeros_like(self.presence_penalties)
         repetition_penalties = jnp.ones_like(self.repetition_penalties)
 
-        for req_set in [
-            self.greedy_reqs,
-            self.random_reqs,
-            self.top_p_reqs,
-            self.top_k_reqs,
-            self.min_p_reqs,
-            self.frequency_penalties_reqs,
-            self.presence_penalties_reqs,
-            self.repetition_penalties_reqs,
-            self.has_allowed_token_ids,
-        ]:
-            req_set.clear()
+        self._flags[:, :dirty_upto] = False
+        self._slot_live[:dirty_upto] = False
+        self._prompt_lens[:dirty_upto] = 0
+        self.generator_seeds[:dirty_upto] = -1
 
         self.min_tokens.clear()
-        self.generator_seeds.clear()
         self.num_logprobs.clear()
         self.num_prompt_logprobs.clear()
         self.in_progress_prompt_logprobs_cpu.clear()
         self.bad_words_token_ids.clear()
-        self.logit_bias = [None] * self.max_num_reqs
+        self.logit_bias.clear()
 
         return replace(
             self,
@@ -1091,7 +1260,9 @@ class SequenceBuffer:
             presence_penalties=presence_penalties,
             repetition_penalties=repetition_penalties,
             page_table=self.page_table.clear(),
-            allowed_token_ids_mask=jnp.zeros_like(self.allowed_token_ids_mask, dtype=bool)
+            _num_reqs=0,
+            _dirty_upto=0,
+            allowed_token_ids_mask=jnp.zeros_like(self.allowed_token_ids_mask)
             if self.allowed_token_ids_mask is not None
             else None,
         )
@@ -1178,7 +1349,8 @@ class DeviceSequenceState:
         presence_penalties: Presence penalty values [max_num_reqs].
         repetition_penalties: Repetition penalty values [max_num_reqs].
         page_table: Page table for KV cache management.
-        allowed_token_ids_mask: Optional mask for allowed tokens.
+        allowed_token_ids_mask: Optional bit-packed disallowed-token mask
+            [max_num_reqs, ceil(vocab_size / 32)] uint32.
 
     Note:
         Use SequenceBuffer.to_device_state()/from_device_state() to convert
@@ -1236,7 +1408,8 @@ class ModelRunnerSamplingMetadata:
         repetition_penalties: Optional repetition penalties.
         output_token_ids: Generated output tokens.
         min_tokens: Minimum tokens to generate.
-        logit_bias: Per-token logit adjustments.
+        logit_bias: Per-request logit adjustments, mapping request index to
+            (token ids int32 [K], bias values float32 [K]).
         allowed_token_ids_mask: Mask for allowed tokens.
         bad_words_token_ids: Tokens to avoid generating.
     """
@@ -1257,7 +1430,7 @@ class ModelRunnerSamplingMetadata:
 
     output_token_ids: list[list[int]] = field(default_factory=list)
     min_tokens: Any = None
-    logit_bias: list[dict[int, float]] = field(default_factory=list)
+    logit_bias: dict[int, tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
     allowed_token_ids_mask: Any = None
     bad_words_token_ids: Any = None
 
@@ -1284,34 +1457,21 @@ class ModelRunnerSamplingMetadata:
             is False, returns zero-filled arrays for efficiency.
         """
         if sequence_buffer.all_greedy is True and not generate_params_if_all_greedy:
+            # JAX arrays are immutable, so the float fields can share one zero buffer
+            zeros = jnp.zeros((padded_num_reqs,), dtype=jnp.float32)
             return cls(
-                temperature=jnp.zeros((padded_num_reqs,), dtype=jnp.float32),
-                min_p=jnp.zeros((padded_num_reqs,), dtype=jnp.float32),
-                top_p=jnp.zeros((padded_num_reqs,), dtype=jnp.float32),
+                temperature=zeros,
+                min_p=zeros,
+                top_p=zeros,
                 top_k=jnp.zeros((padded_num_reqs,), dtype=jnp.int32),
             )
 
-        num_reqs = sequence_buffer.num_reqs
-
-        return cls(
-            temperature=fill_slice(sequence_buffer.temperature, -1.0, num_reqs, padded_num_reqs).astype(jnp.float32),
-            min_p=fill_slice(sequence_buffer.min_p, 0.0, num_reqs, padded_num_reqs).astype(jnp.float32),
-            top_p=fill_slice(sequence_buffer.top_p, 1.0, num_reqs, padded_num_reqs).astype(jnp.float32),
-            top_k=fill_slice(sequence_buffer.top_k, 0, num_reqs, padded_num_reqs).astype(jnp.int32),
+        temperature, min_p, top_p, top_k = build_sampling_arrays(
+            sequence_buffer.temperature,
+            sequence_buffer.min_p,
+            sequence_buffer.top_p,
+            sequence_buffer.top_k,
+            sequence_buffer.num_reqs,
+            padded_num_reqs,
         )
-
-
-@ejit(static_argnums=(2, 3))
-def fill_slice(arr, fill_val, num_reqs, padded_num_reqs):
-    """Fill array slice with padding value.
-
-    Args:
-        arr: Input array to pad.
-        fill_val: Value to use for padding.
-        num_reqs: Number of valid requests.
-        padded_num_reqs: Target padded size.
-
-    Returns:
-        Array with padding applied from num_reqs to padded_num_reqs.
-    """
-    return arr.at[num_reqs:padded_num_reqs].set(fill_val)[:padded_num_reqs]
+        return cls(temperature=temperature, min_p=min_p, top_p=top_p, top_k=top_k)
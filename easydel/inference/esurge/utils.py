@@ -48,6 +48,11 @@ class ConstantList(Generic[T], Sequence):
     modification operations. Useful for protecting data structures
     that should not be changed after creation.
 
+    The wrapper is a live view: changes made to the underlying list by its
+    owner are visible through it, which is why it wraps rather than copies.
+    Every read (including the `Sequence` mixin methods) is delegated straight
+    to the C-level list operation instead of the generic per-element fallbacks.
+
     Args:
         x: The list to wrap and make immutable.
 
@@ -58,6 +63,8 @@ class ConstantList(Generic[T], Sequence):
         >>> const_list.append(4)  # Raises Exception
     """
 
+    __slots__ = ("_x",)
+
     def __init__(self, x: list[T]) -> None:
         """Initialize with a list to make immutable.
 
@@ -85,7 +92,12 @@ class ConstantList(Generic[T], Sequence):
         raise Exception("Cannot clear a constant list")
 
     def index(self, item: T, start: int = 0, stop: int | None = None) -> int:
-        return self._x.index(item, start, stop if stop is not None else len(self._x))
+        if stop is None:
+            return self._x.index(item, start)
+        return self._x.index(item, start, stop)
+
+    def count(self, item: T) -> int:
+        return self._x.count(item)
 
     @overload
     def __getitem__(self, item: int) -> T: ...
@@ -111,6 +123,9 @@ class ConstantList(Generic[T], Sequence):
     def __iter__(self):
         return iter(self._x)
 
+    def __reversed__(self):
+        return reversed(self._x)
+
     def __contains__(self, item):
         return item in self._x
 
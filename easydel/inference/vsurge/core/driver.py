@@ -25,7 +25,15 @@ from eformer.loggings import get_logger
 from jax import numpy as jnp
 
 from ...sampling_params import JitableSamplingParams
-from ..utils import ActiveRequest, MetricsRecorder, ReturnSample, SafeThread, pad_tokens, process_result_tokens
+from ..utils import (
+    SHUTDOWN,
+    ActiveRequest,
+    MetricsRecorder,
+    ReturnSample,
+    SafeThread,
+    pad_tokens,
+    process_result_tokens,
+)
 from .engine import vEngine
 from .scheduler import Scheduler, SchedulerAction
 
@@ -273,7 +281,7 @@ class vDriver:
 
         self.log("[Detokenize] Detokenization thread started.")
 
-        while self.live:
+        while self.live and not SHUTDOWN.is_set():
             try:
                 data = self._detokenize_queue.get(timeout=0.1)
             except queue.Empty:
@@ -326,7 +334,7 @@ class vDriver:
             request.decode_start_time = time.perf_counter()
 
         # Use the existing process_result_tokens function
-        results_base, complete, num_valid_tokens_list = process_result_tokens(
+        step_batch, complete = process_result_tokens(
             processor=processor,
             slot=slot,
             slot_max_length=request.sampling_params.max_tokens,
@@ -340,9 +348,18 @@ class vDriver:
         request.complete = complete
         elapsed_time = time.perf_counter() - request.decode_start_time
 
-        for res_base, num_valid in zip(results_base, num_valid_tokens_list, strict=False):
-            if len(res_base.text) > 0:
-                request.add_text_fragments(res_base.text)
+        # Running token totals after each sample, as the per-sample results report them
+        generated_totals = (request.total_generated_tokens + np.cumsum(step_batch.valid_counts)).tolist()
+        # Posted to the return channel together after the loop (one cross-thread wakeup per step)
+        pending: list[list[ReturnSample]] = []
+        for text, token_ids, generated_total in zip(
+            step_batch.texts_per_sample,
+            step_batch.token_ids_per_sample,
+            generated_totals,
+            strict=True,
+        ):
+            if len(text) > 0:
+                request.add_text_fragments(text)
 
             # Check stop conditions
             if request.sampling_params.stop is not None:
@@ -351,19 +368,21 @@ class vDriver:
                         if stop_sign in accum:
                             request.complete[idx] = True
 
-            request.total_generated_tokens += num_valid
+            request.total_generated_tokens = generated_total
             tps = request.total_generated_tokens / elapsed_time if elapsed_time > 1e-6 else 0.0
 
             if request.return_channel:
                 result = ReturnSample(
-                    text=res_base.text,
-                    token_ids=res_base.token_ids,
+                    text=text,
+                    token_ids=token_ids,
                     time_spent_computing=elapsed_time,
                     accumulated_text=request.accumulated_text,
                     tokens_per_second=tps,
                     num_generated_tokens=request.total_generated_tokens,
                 )
-                request.enqueue_samples([result])
+                pending.append([result])
+        if pending:
+            request.enqueue_sample_groups(pending)
 
     def _process_first_token(self, first_token, request: ActiveRequest, processor):
         """Process first token from prefill."""
@@ -373,7 +392,7 @@ class vDriver:
         if not hasattr(request, "complete") or request.complete is None:
             request.complete = np.zeros((self._engine.samples_per_slot,), dtype=np.bool_)
 
-        results_base, complete, num_valid_tokens_list = process_result_tokens(
+        step_batch, complete = process_result_tokens(
             processor=processor,
             slot=0,
             slot_max_length=request.sampling_params.max_tokens,
@@ -386,25 +405,29 @@ class vDriver:
 
         request.complete = complete
 
-        for res_base, num_valid in zip(results_base, num_valid_tokens_list, strict=False):
-            if isinstance(res_base.text, list):
-                request.add_text_fragments(res_base.text)
-            else:
-                text_list = [str(res_base.text)] if res_base.text is not None else [""]
-                request.add_text_fragments(text_list)
-
-            request.total_generated_tokens += num_valid
+        generated_totals = (request.total_generated_tokens + np.cumsum(step_batch.valid_counts)).tolist()
+        pending: list[list[ReturnSample]] = []
+        for text, token_ids, generated_total in zip(
+            step_batch.texts_per_sample,
+            step_batch.token_ids_per_sample,
+            generated_totals,
+            strict=True,
+        ):
+            request.add_text_fragments(text)
+            request.total_generated_tokens = generated_total
 
             if request.return_channel:
                 result = ReturnSample(
-                    text=res_base.text,
-                    token_ids=res_base.token_ids,
+                    text=text,
+                    token_ids=token_ids,
                     time_spent_computing=0.0,
                     accumulated_text=request.accumulated_text,
                     tokens_per_second=0.0,
                     num_generated_tokens=request.total_generated_tokens,
                 )
-                request.enqueue_samples([result])
+                pending.append([result])
+        if pending:
+            request.enqueue_sample_groups(pending)
 
         first_token_duration = (time.perf_counter() - first_token_start) * 1000
         self.metrics_recorder.record_ttft(first_token_duration)
@@ -423,10 +446,10 @@ class vDriver:
         """Processes the content of a prefill request for the engine."""
         content = request.prefill_content
         if isinstance(content, str):
-            # Use a more efficient tokenization approach
+            # Keep the tokenizer output on the host; pad_tokens pads in NumPy and does the single transfer
             content = processor(text=content, return_tensors="np", return_attention_mask=True)
-            tokens = jnp.array(content["input_ids"])
-            valids = jnp.array(content["attention_mask"])
+            tokens = np.asarray(content["input_ids"])
+            valids = np.asarray(content["attention_mask"])
         else:
             tokens, valids = content
 
@@ -455,7 +478,7 @@ class vDriver:
 
         last_slot_clear_step = 0
 
-        while self.live:
+        while self.live and not SHUTDOWN.is_set():
             action: SchedulerAction = self.scheduler.schedule()
             for request in action.prefill_requests:
                 decode_state = self._process_single_prefill_request(request, engine, processor, decode_state)
@@ -557,7 +580,7 @@ class vDriver:
         first_token_np = first_token.convert_to_numpy()
         if not hasattr(request, "complete") or request.complete is None:
             request.complete = np.zeros((engine.samples_per_slot,), dtype=np.bool_)
-        results_base, complete, num_valid_tokens_list = process_result_tokens(
+        step_batch, complete = process_result_tokens(
             processor=processor,
             slot=0,
             slot_max_length=request.sampling_params.max_tokens,
@@ -568,20 +591,21 @@ class vDriver:
             ignore_eos=request.sampling_params.ignore_eos,
         )
         request.complete = complete
+        generated_totals = (request.total_generated_tokens + np.cumsum(step_batch.valid_counts)).tolist()
         final_results = []
-        for res_base, num_valid in zip(results_base, num_valid_tokens_list, strict=False):
+        for text, token_ids, generated_total in zip(
+            step_batch.texts_per_sample,
+            step_batch.token_ids_per_sample,
+            generated_totals,
+            strict=True,
+        ):
             # Initialize text fragments with first token
-            if isinstance(res_base.text, list):
-                request.add_text_fragments(res_base.text)
-            else:
-                text_list = [str(res_base.text)] if res_base.text is not None else [""]
-                request.add_text_fragments(text_list)
-
-            request.total_generated_tokens += num_valid
+            request.add_text_fragments(text)
+            request.total_generated_tokens = generated_total
             final_results.append(
                 ReturnSample(
-                    text=res_base.text,
-                    token_ids=res_base.token_ids,
+                    text=text,
+                    token_ids=token_ids,
                     time_spent_computing=0.0,
                     accumulated_text=request.accumulated_text,  # Uses the property
                     tokens_per_second=0.0,
@@ -608,7 +632,7 @@ class vDriver:
 
     def _metrics_monitor_thread_action(self):
         """Background thread action for periodically updating and logging metrics."""
-        while self.live:
+        while self.live and not SHUTDOWN.is_set():
             try:
                 self.metrics_recorder.update_queue_size("free_decode_slots", self.scheduler.get_free_slot_count())
                 self.metrics_recorder.set_active_requests_count(self.scheduler.get_active_request_count())
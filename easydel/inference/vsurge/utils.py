@@ -17,23 +17,29 @@ from __future__ import annotations
 import asyncio
 import collections
 import dataclasses
+import functools
+import itertools
 import os
+import re
+import secrets
 import signal
+import sys
 import threading
 import time
 import traceback
 import typing as tp
-import uuid
+import weakref
 from asyncio import futures
 from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any
 
 import jax
 import numpy as np
 from eformer.loggings import get_logger
 from eformer.pytree import auto_pytree
-from jax import numpy as jnp
 
 from easydel.layers.caching import PagesCache, TransformerCache
 
@@ -45,6 +51,21 @@ if tp.TYPE_CHECKING:
 
 _V = tp.TypeVar("_V")
 
+# Lazily created pools used by ResultTokens.copy_to_host_chunked, one per worker count. Pools are
+# never shut down here, so a caller still holding one can always keep scheduling on it.
+_D2H_EXECUTORS: dict[int, ThreadPoolExecutor] = {}
+_D2H_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_d2h_executor(num_threads: int) -> ThreadPoolExecutor:
+    """Returns the device-to-host copy pool with `num_threads` workers, creating it on first use."""
+    with _D2H_EXECUTOR_LOCK:
+        executor = _D2H_EXECUTORS.get(num_threads)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="easydel-d2h")
+            _D2H_EXECUTORS[num_threads] = executor
+        return executor
+
 
 class SlotData(tp.NamedTuple):
     """Represents the output data for a single inference slot.
@@ -110,16 +131,57 @@ class ResultTokens(tp.NamedTuple):
         """Converts the internal `data` array to a NumPy array synchronously.
 
         Returns:
-            A new ResultTokens instance with the data as a NumPy array.
+            A ResultTokens instance with the data as a NumPy array. If the data
+            already is one, `self` is returned unchanged.
+
+        Note:
+            Uses `np.asarray` so the host buffer filled by `copy_to_host_async()`
+            is reused instead of being copied again.
         """
+        if isinstance(self.data, np.ndarray):
+            return self
         return ResultTokens(
-            np.array(self.data),
+            np.asarray(self.data),
             self.tokens_idx,
             self.valid_idx,
             self.length_idx,
             self.samples_per_slot,
         )
 
+    def copy_to_host_chunked(self: ResultTokens, num_threads: int = 4) -> ResultTokens:
+        """Copies `data` to the host in row slabs transferred concurrently.
+
+        The rows are split into `num_threads` slabs; each slab's transfer is
+        started with `copy_to_host_async()` and then materialized by a worker
+        thread into one preallocated NumPy buffer, so several device-to-host
+        copies are in flight at once instead of a single serialized one.
+
+        Args:
+            num_threads: Number of concurrent slabs/worker threads. Defaults to 4.
+
+        Returns:
+            A ResultTokens instance with the data as a NumPy array. Falls back to
+            `convert_to_numpy()` for a single thread, host data, or fewer rows
+            than threads.
+        """
+        rows = self.data.shape[0]
+        if num_threads <= 1 or isinstance(self.data, np.ndarray) or rows < num_threads:
+            return self.convert_to_numpy()
+
+        host = np.empty(self.data.shape, dtype=self.data.dtype)
+        bounds = np.linspace(0, rows, num_threads + 1, dtype=np.int64).tolist()
+        slabs = [(lo, hi, self.data[lo:hi]) for lo, hi in itertools.pairwise(bounds)]
+        for _, _, slab in slabs:
+            slab.copy_to_host_async()
+
+        def fetch(slab_info: tuple[int, int, jax.Array]) -> None:
+            lo, hi, slab = slab_info
+            np.copyto(host[lo:hi], np.asarray(slab))
+
+        # Consume the iterator so worker exceptions are raised here
+        list(_get_d2h_executor(num_threads).map(fetch, slabs))
+        return self._replace(data=host)
+
     def get_result_at_slot(self, slot: int) -> SlotData:
         """Extracts the generation results for a specific inference slot.
 
@@ -133,6 +195,9 @@ class ResultTokens(tp.NamedTuple):
         Note:
             This method correctly handles potential microbatching by using
             `samples_per_slot` to calculate the correct indices within the `data` array.
+            In per-step loops over slots, call `copy_to_host_async()` and
+            `convert_to_numpy()` once beforehand so slicing happens on the host;
+            slicing a device array here issues separate transfers per slot.
         """
         start_idx = slot * self.samples_per_slot
         end_idx = (slot + 1) * self.samples_per_slot
@@ -182,7 +247,7 @@ class GenerationState:
     sampling_params: JitableSamplingParams
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class ReturnSample:
     """Represents a single generated sample with text, token IDs, and metrics.
 
@@ -211,6 +276,35 @@ class ReturnSample:
     generation_idx: int | None = dataclasses.field(default=None)
 
 
+@dataclasses.dataclass(slots=True)
+class ReturnSampleBatch:
+    """Step output of one slot, stored as parallel per-sample columns.
+
+    Produced by `process_result_tokens` so the driver can aggregate counts with
+    NumPy instead of reading them back from one `ReturnSample` per sample.
+
+    Attributes:
+      token_ids_per_sample: The token IDs emitted in this step, per sample.
+      texts_per_sample: The detokenized pieces of those tokens, per sample
+                        (empty lists under client-side tokenization).
+      valid_counts: Number of tokens emitted in this step, per sample.
+    """
+
+    token_ids_per_sample: list[list[int]]
+    texts_per_sample: list[list[str]]
+    valid_counts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.token_ids_per_sample)
+
+    def to_return_samples(self) -> list[ReturnSample]:
+        """Builds one `ReturnSample` (text and token IDs only) per sample."""
+        return [
+            ReturnSample(text=text, token_ids=token_ids)
+            for text, token_ids in zip(self.texts_per_sample, self.token_ids_per_sample, strict=True)
+        ]
+
+
 class _Exception:
     """A class for propagating exceptions through a queue.
 
@@ -230,13 +324,28 @@ class AsyncMultifuture(tp.Generic[_V]):
 
     Supports delivering results to an async Python event loop. Must be
     constructed inside of the event loop.
+
+    Results are buffered in a plain deque that is only touched from the event
+    loop thread, with an `asyncio.Event` waking the consumer; this avoids the
+    getter/putter bookkeeping of `asyncio.Queue` for a single-consumer stream.
     """
 
     def __init__(self) -> None:
         self._cancelled = threading.Event()
         self._done = threading.Event()
         self._loop = asyncio.get_running_loop()
-        self._queue = asyncio.Queue[_V | _Exception]()
+        self._buffer: collections.deque[_V | _Exception] = collections.deque()
+        self._ready = asyncio.Event()
+
+    def _push(self, item: _V | _Exception) -> None:
+        """Appends an item and wakes the consumer. Runs on the event loop thread."""
+        self._buffer.append(item)
+        self._ready.set()
+
+    def _push_many(self, items: list[_V]) -> None:
+        """Appends several items and wakes the consumer once. Runs on the event loop thread."""
+        self._buffer.extend(items)
+        self._ready.set()
 
     def cancel(self, unused: tp.Any = None) -> None:
         """Cancels the asyncmultifuture."""
@@ -265,7 +374,7 @@ class AsyncMultifuture(tp.Generic[_V]):
         Args:
           exception: The exception to set.
         """
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, _Exception(exception))
+        self._loop.call_soon_threadsafe(self._push, _Exception(exception))
         self._loop.call_soon_threadsafe(self._done.set)
 
     def add_result(self, result: _V) -> None:
@@ -276,7 +385,19 @@ class AsyncMultifuture(tp.Generic[_V]):
         Args:
           result: The result to add.
         """
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, result)
+        self._loop.call_soon_threadsafe(self._push, result)
+
+    def add_results(self, results: list[_V]) -> None:
+        """Adds several results with a single cross-thread wakeup.
+
+        Equivalent to calling `add_result` for each item in order; the consumer
+        still receives them one by one.
+
+        Args:
+          results: The results to add.
+        """
+        if results:
+            self._loop.call_soon_threadsafe(self._push_many, results)
 
     def close(self) -> None:
         """Notifies the receiver that no more results would be added."""
@@ -287,13 +408,16 @@ class AsyncMultifuture(tp.Generic[_V]):
 
     async def __anext__(self) -> _V:
         """Returns the next value."""
-        value = await self._queue.get()
+        while not self._buffer:
+            self._ready.clear()
+            await self._ready.wait()
+        value = self._buffer.popleft()
         if isinstance(value, _Exception):
             raise value.exception
         return value
 
 
-@dataclass
+@dataclass(slots=True)
 class ActiveRequestMetadata:
     """Inference request metadata."""
 
@@ -311,7 +435,17 @@ class ActiveRequestMetadata:
     complete_time: float | None = None
 
 
-@dataclass
+# Request ids are a per-process random prefix plus a counter: unique within the
+# process and cheap to mint (no UUID object or urandom read per request).
+_REQUEST_ID_PREFIX = secrets.token_hex(4)
+_REQUEST_ID_COUNTER = itertools.count()
+
+
+def _new_request_id() -> str:
+    return f"{_REQUEST_ID_PREFIX}-{next(_REQUEST_ID_COUNTER)}"
+
+
+@dataclass(slots=True)
 class ActiveRequest:
     """Current state of the driver."""
 
@@ -334,7 +468,7 @@ class ActiveRequest:
     total_generated_tokens: int = 0
     metadata: ActiveRequestMetadata = field(default_factory=ActiveRequestMetadata)
 
-    id: str = field(default_factory=uuid.uuid4)
+    id: str = field(default_factory=_new_request_id)
 
     _token_ids: list[int] | None = None
     _attention_mask: np.ndarray | None = None
@@ -354,6 +488,10 @@ class ActiveRequest:
         """Adds the generated sample(s) to return channel for current step."""
         self.return_channel.add_result(generated_samples)
 
+    def enqueue_sample_groups(self, sample_groups: list[list[ReturnSample]]):
+        """Adds several `enqueue_samples` payloads to the return channel in one handoff."""
+        self.return_channel.add_results(sample_groups)
+
     def add_text_fragments(self, new_fragments: list[str]) -> None:
         """Efficiently append new text fragments."""
         if not self._accumulated_texts:
@@ -398,27 +536,62 @@ class ActiveRequest:
         return self._accumulated_texts[sample_idx][last_pos:]
 
 
+# Set once a SafeThread has failed and the process is going down; driver loops stop when it is set.
+SHUTDOWN = threading.Event()
+_SHUTDOWN_GRACE_SECONDS = 10.0
+_SAFE_THREADS: weakref.WeakSet[SafeThread] = weakref.WeakSet()
+
+
+def _shutdown_process(failed: threading.Thread) -> None:
+    """Lets the other SafeThreads wind down, then exits with status 1 (SIGKILL if exiting hangs)."""
+    if SHUTDOWN.is_set():
+        return
+    SHUTDOWN.set()
+    watchdog = threading.Timer(2 * _SHUTDOWN_GRACE_SECONDS, os.kill, args=(os.getpid(), signal.SIGKILL))
+    watchdog.daemon = True
+    watchdog.start()
+    deadline = time.monotonic() + _SHUTDOWN_GRACE_SECONDS
+    for thread in list(_SAFE_THREADS):
+        if thread is not failed and thread.is_alive():
+            thread.join(max(0.0, deadline - time.monotonic()))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(1)
+
+
 class SafeThread(threading.Thread):
-    """Thread that kills the program if it fails.
+    """Thread that takes the program down if it fails.
 
     If a driver thread goes down, we can't operate.
     """
 
+    def start(self):
+        _SAFE_THREADS.add(self)
+        super().start()
+
     def run(self):
         """Executes the thread's target function.
 
         If the target function raises any exception, this method catches it,
-        prints the traceback, and forcefully kills the entire process using
-        `os.kill` with `signal.SIGKILL`. This ensures that if a critical
+        prints the traceback, sets `SHUTDOWN` so the other driver loops stop,
+        waits up to a short grace period for the other SafeThreads to finish
+        and exits the process with status 1. This ensures that if a critical
         driver thread fails, the whole system stops, preventing potential
-        inconsistent states or hangs.
+        inconsistent states or hangs. Should exiting hang, the process is
+        killed with `signal.SIGKILL`.
         """
         try:
             super().run()
         except Exception as e:
             print(f"Thread {self.name} encountered an error: {e}")
             traceback.print_exc()
-            os.kill(os.getpid(), signal.SIGKILL)
+            _shutdown_process(self)
+
+
+@functools.lru_cache(maxsize=64)
+def _eos_ids_array(eos_ids: tuple[int, ...]) -> np.ndarray:
+    """Returns the deduplicated EOS ids as a sorted int64 array, cached per id tuple."""
+    return np.fromiter(sorted(set(eos_ids)), dtype=np.int64)
 
 
 def process_result_tokens(
@@ -430,7 +603,7 @@ def process_result_tokens(
     eos_token_id: list[int],
     is_client_side_tokenization: bool = False,
     ignore_eos: bool = False,
-) -> tuple[list[ReturnSample], np.ndarray, list[int]]:
+) -> tuple[ReturnSampleBatch, np.ndarray]:
     """
     Processes the result tokens for a given slot, extracts text and token IDs,
     updates completion status, and counts valid tokens generated in this step.
@@ -445,44 +618,59 @@ def process_result_tokens(
 
     Returns:
         A tuple containing:
-            - A list of ReturnSample objects (without TPS/count populated yet).
+            - A ReturnSampleBatch with the step's token IDs, texts and valid
+              token counts per sample.
             - The updated completion status array.
-            - A list containing the number of valid tokens generated in this step
-              for each corresponding ReturnSample.
+
+    Note:
+        The slot is converted to NumPy once and the first terminating speculation
+        (EOS unless `ignore_eos`, or an invalid token) of every sample is located
+        with array ops, so no per-token `.item()` round-trips are made. All
+        surviving tokens of the slot are detokenized with one `batch_decode` call.
     """
+    if not isinstance(result_tokens.data, np.ndarray):
+        # One coalesced transfer of the whole result instead of one per slice
+        result_tokens = result_tokens.convert_to_numpy()
     slot_data = result_tokens.get_result_at_slot(slot)
-    slot_tokens = slot_data.tokens
-    slot_valid = slot_data.valid
-    slot_lengths = slot_data.lengths
+    slot_tokens = np.asarray(slot_data.tokens)
+    slot_valid = np.asarray(slot_data.valid).astype(bool)
+    slot_lengths = np.asarray(slot_data.lengths)
     samples, speculations = slot_tokens.shape
 
-    if isinstance(eos_token_id, int):
-        eos_token_id = [eos_token_id]
-    complete = complete | (slot_lengths > slot_max_length)
-    return_samples = []
-    num_valid_tokens_step = []  # Track valid tokens generated in this step per sample
-    for idx in range(samples):
-        text_so_far = []
-        tok_id_so_far = []
-        valid_tokens_count = 0
-        if not complete[idx].item():
-            for spec_idx in range(speculations):
-                tok_id = slot_tokens[idx, spec_idx].item()
-                valid = slot_valid[idx, spec_idx].item()
-                if (tok_id in eos_token_id and not ignore_eos) or not valid:
-                    complete[idx] = True
-                    if valid and tok_id in eos_token_id:
-                        tok_id_so_far.append(tok_id)
-                        valid_tokens_count += 1
-                    break
-                else:
-                    if not is_client_side_tokenization:
-                        text_so_far.append(processor.decode([tok_id], skip_special_tokens=True))
-                    tok_id_so_far.append(tok_id)
-                    valid_tokens_count += 1
-        return_samples.append(ReturnSample(text=text_so_far, token_ids=tok_id_so_far))
-        num_valid_tokens_step.append(valid_tokens_count)
-    return return_samples, complete, num_valid_tokens_step
+    if ignore_eos:
+        # Only invalid tokens terminate, and those are never emitted
+        terminal = ~slot_valid
+        has_terminal = terminal.any(axis=1)
+        cut = np.where(has_terminal, terminal.argmax(axis=1), speculations)
+        keep_terminal = np.zeros(samples, dtype=bool)
+    else:
+        eos_ids = _eos_ids_array((eos_token_id,) if isinstance(eos_token_id, int) else tuple(eos_token_id))
+        is_eos = np.isin(slot_tokens, eos_ids)
+        terminal = is_eos | ~slot_valid
+        has_terminal = terminal.any(axis=1)
+        cut = np.where(has_terminal, terminal.argmax(axis=1), speculations)
+        # A terminating EOS is still emitted when it is valid
+        at_cut = np.minimum(cut, speculations - 1)
+        keep_terminal = has_terminal & (slot_valid & is_eos)[np.arange(samples), at_cut]
+
+    active = ~(np.asarray(complete) | (slot_lengths > slot_max_length))
+    complete = ~active | has_terminal
+    prefixes = [slot_tokens[idx, : cut[idx]].tolist() if active[idx] else [] for idx in range(samples)]
+
+    texts: list[list[str]] = [[] for _ in range(samples)]
+    if not is_client_side_tokenization:
+        flat_ids = [[tok_id] for prefix in prefixes for tok_id in prefix]
+        if flat_ids:
+            flat_texts = processor.batch_decode(flat_ids, skip_special_tokens=True)
+            offset = 0
+            for idx, prefix in enumerate(prefixes):
+                texts[idx] = flat_texts[offset : offset + len(prefix)]
+                offset += len(prefix)
+
+    for idx in np.flatnonzero(active & keep_terminal).tolist():
+        prefixes[idx].append(int(slot_tokens[idx, cut[idx]]))
+    valid_counts = np.fromiter(map(len, prefixes), dtype=np.int64, count=samples)
+    return ReturnSampleBatch(token_ids_per_sample=prefixes, texts_per_sample=texts, valid_counts=valid_counts), complete
 
 
 def tokenize_and_pad(
@@ -542,7 +730,15 @@ def tokenize_and_pad(
     return padded_tokens, padded_valids, padded_length
 
 
-DEFAULT_PREFILL_BUCKETS = [2**s for s in range(5, 24)]
+DEFAULT_PREFILL_BUCKETS = tuple(2**s for s in range(5, 24))
+
+
+@functools.lru_cache(maxsize=32)
+def _derive_prefill_buckets(buckets: tuple[int, ...], max_prefill_length: int | None) -> tuple[int, ...]:
+    """Returns `buckets` cut at `max_prefill_length` (which is kept as the last bucket), cached per input."""
+    if max_prefill_length is None:
+        return buckets
+    return (*buckets[: buckets.index(max_prefill_length)], max_prefill_length)
 
 
 def take_nearest_length(lengths: list[int], length: int) -> int:
@@ -565,6 +761,12 @@ def take_nearest_length(lengths: list[int], length: int) -> int:
     return lengths[pos]
 
 
+@functools.lru_cache(maxsize=4096)
+def _nearest_prefill_bucket(buckets: tuple[int, ...], length: int) -> int:
+    """`take_nearest_length` memoized per (buckets, length), so repeated prompt lengths skip the search."""
+    return take_nearest_length(buckets, length)
+
+
 def pad_tokens(
     tokens: np.ndarray,
     valids: np.ndarray,
@@ -599,7 +801,8 @@ def pad_tokens(
             larger than this are ignored, and this value is used as the maximum
             padding length.
         jax_padding: If True, converts the padded NumPy arrays to JAX arrays
-            before returning. Defaults to True.
+            before returning. Defaults to True. Pass False to keep host arrays,
+            e.g. to stack several requests and transfer them together.
         bos_token_id: The beginning-of-sequence token ID (currently unused).
         is_bos: Flag indicating if BOS token handling is expected (currently unused).
 
@@ -611,33 +814,56 @@ def pad_tokens(
     """
     if prefill_lengths is None:
         prefill_lengths = DEFAULT_PREFILL_BUCKETS
-    if max_prefill_length is not None:
-        prefill_lengths = [*prefill_lengths[: prefill_lengths.index(max_prefill_length)], max_prefill_length]
+    prefill_lengths = _derive_prefill_buckets(tuple(prefill_lengths), max_prefill_length)
     tokens = tokens.ravel()  # 1d Only
     valids = valids.ravel()
     true_length = tokens.shape[-1]
     assert valids.size == tokens.size
-    padded_length = take_nearest_length(prefill_lengths, true_length)
-    padding = padded_length - true_length
+    padded_length = _nearest_prefill_bucket(prefill_lengths, true_length)
 
-    if padding < 0:
-        padded_tokens = tokens[-padded_length:]
-        padded_valids = valids[-padded_length:]
+    if true_length <= padded_length:
+        padded_tokens, padded_valids = _pad_tokens_fast(tokens, valids, pad_token_id, padded_length, right_padding)
     else:
-        paddin = (0, padding) if right_padding else (padding, 0)
-        padded_tokens = np.pad(tokens, paddin, constant_values=(pad_token_id,))
-        padded_valids = np.pad(valids, paddin, constant_values=(0,))
+        padded_tokens, padded_valids = _truncate_tokens(tokens, valids, padded_length)
+        true_length = padded_length
 
     if jax_padding:
-        padded_tokens = jnp.array([padded_tokens])
-        padded_valids = jnp.array([padded_valids])
-
-    if true_length > padded_tokens.shape[-1]:
-        true_length = padded_tokens.shape[-1]
+        # Add the batch axis as a view and transfer both arrays in one device_put call
+        padded_tokens, padded_valids = jax.device_put((padded_tokens[None], padded_valids[None]))
 
     return padded_tokens, padded_valids, true_length
 
 
+def _pad_tokens_fast(
+    tokens: np.ndarray,
+    valids: np.ndarray,
+    pad_token_id: int,
+    bucket: int,
+    right_padding: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pads 1D `tokens`/`valids` that fit in `bucket` up to exactly `bucket` entries."""
+    # One allocation + fill per output, then copy the real tokens into place
+    padded_tokens = np.full(bucket, pad_token_id, dtype=tokens.dtype)
+    padded_valids = np.zeros(bucket, dtype=valids.dtype)
+    window = slice(0, tokens.size) if right_padding else slice(bucket - tokens.size, bucket)
+    padded_tokens[window] = tokens
+    padded_valids[window] = valids
+    return padded_tokens, padded_valids
+
+
+def _truncate_tokens(tokens: np.ndarray, valids: np.ndarray, bucket: int) -> tuple[np.ndarray, np.ndarray]:
+    """Keeps the last `bucket` entries of 1D `tokens`/`valids` that overflow the largest bucket."""
+    return tokens[-bucket:], valids[-bucket:]
+
+
+_BYTE_TOKEN_MATCH = re.compile(r"<0x[0-9A-Fa-f]{2}>").fullmatch
+
+# Every spelling of "<0xXX>" (any hex-digit case) mapped to its byte value
+_BYTE_TOKEN_VALUES: dict[str, int] = {
+    f"<0x{hi}{lo}>": int(hi + lo, 16) for hi in "0123456789abcdefABCDEF" for lo in "0123456789abcdefABCDEF"
+}
+
+
 def is_byte_token(s: str) -> bool:
     """Returns True if s is a byte string like "<0xAB>".
 
@@ -648,11 +874,10 @@ def is_byte_token(s: str) -> bool:
         s: The input string to check.
 
     Returns:
-        True if the string matches the byte token format "<0xXX>", False otherwise.
+        True if the string matches the byte token format "<0xXX>" (XX being two
+        hex digits), False otherwise.
     """
-    if len(s) != 6 or s[0:3] != "<0x" or s[-1] != ">":
-        return False
-    return True
+    return len(s) == 6 and _BYTE_TOKEN_MATCH(s) is not None
 
 
 def text_tokens_to_string(text_tokens: tp.Iterable[str]) -> str:
@@ -676,13 +901,15 @@ def text_tokens_to_string(text_tokens: tp.Iterable[str]) -> str:
     Returns:
         The decoded string representation of the token sequence.
     """
-    bytes_so_far = []
+    byte_values = _BYTE_TOKEN_VALUES
+    bytes_so_far = bytearray()
     for text_token in text_tokens:
-        if is_byte_token(text_token):
-            bytes_so_far.append(bytes([int(text_token[1:-1], 16)]))
+        value = byte_values.get(text_token)
+        if value is not None:
+            bytes_so_far.append(value)
         else:
-            bytes_so_far.append(bytes(text_token, "utf-8"))
-    return b"".join(bytes_so_far).decode("utf-8", "replace")
+            bytes_so_far.extend(text_token.encode("utf-8"))
+    return bytes_so_far.decode("utf-8", "replace")
 
 
 def calculate_pefill_lengths(max_prefill_length: int, num_pages: int = 128):
@@ -693,6 +920,100 @@ def calculate_pefill_lengths(max_prefill_length: int, num_pages: int = 128):
     )
 
 
+class _MetricsCell:
+    """Metric storage of one thread for a `MetricsRecorder`.
+
+    Only the owning thread writes to a cell, so its ring buffers and counters
+    need no lock. Every sample is stored with a recorder-wide sequence number
+    so samples from different cells can be merged back into recording order.
+    Ring buffers are allocated on the first sample of their series, so threads
+    that only bump counters stay small.
+    """
+
+    __slots__ = (
+        "capacity",
+        "counts",
+        "owner",
+        "series",
+        "series_count",
+        "series_head",
+        "series_seq",
+        "series_written",
+    )
+
+    def __init__(
+        self,
+        series_keys: tuple[str, ...],
+        counter_keys: tuple[str, ...],
+        capacity: int,
+        owner: threading.Thread | None = None,
+    ):
+        self.capacity = capacity
+        # The recording thread; None for the cell holding the data of exited threads
+        self.owner = weakref.ref(owner) if owner is not None else None
+        self.counts = dict.fromkeys(counter_keys, 0)
+        self.series: dict[str, np.ndarray] = {}
+        self.series_seq: dict[str, np.ndarray] = {}
+        self.series_head = dict.fromkeys(series_keys, 0)
+        self.series_count = dict.fromkeys(series_keys, 0)
+        # Samples ever written per series (not capped like `series_count`), used to detect new data
+        self.series_written = dict.fromkeys(series_keys, 0)
+
+    @property
+    def exited(self) -> bool:
+        """Whether the owning thread has finished; cells without an owner never exit."""
+        if self.owner is None:
+            return False
+        thread = self.owner()
+        return thread is None or not thread.is_alive()
+
+    def append(self, key: str, value: float, seq: int):
+        """Writes a sample into the ring buffer of `key`, overwriting the oldest once full."""
+        if key not in self.series:
+            self.series[key] = np.empty(self.capacity, dtype=np.float64)
+            self.series_seq[key] = np.empty(self.capacity, dtype=np.int64)
+        head = self.series_head[key]
+        capacity = self.capacity
+        self.series[key][head] = value
+        self.series_seq[key][head] = seq
+        self.series_head[key] = (head + 1) % capacity
+        self.series_count[key] = min(self.series_count[key] + 1, capacity)
+        self.series_written[key] += 1
+
+    def recent(self, key: str, window_size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns copies of the last `window_size` samples (all if 0) of `key` and their sequence numbers."""
+        if key not in self.series:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+        count = self.series_count[key]
+        n = min(window_size, count) if window_size > 0 else count
+        head = self.series_head[key]
+        idx = np.arange(head - n, head) % self.capacity
+        return self.series[key][idx], self.series_seq[key][idx]
+
+    def merged(self, others: list[_MetricsCell]) -> _MetricsCell:
+        """Returns a new ownerless cell summing the counters of `self` and `others`, keeping their latest samples."""
+        cell = _MetricsCell(tuple(self.series_head), tuple(self.counts), self.capacity)
+        sources = [self, *others]
+        for key in cell.counts:
+            cell.counts[key] = sum(source.counts[key] for source in sources)
+        for key in cell.series_head:
+            cell.series_written[key] = sum(source.series_written[key] for source in sources)
+            parts = [source.recent(key, 0) for source in sources]
+            values = np.concatenate([part[0] for part in parts])
+            if not values.size:
+                continue
+            seqs = np.concatenate([part[1] for part in parts])
+            order = np.argsort(seqs, kind="stable")[-self.capacity :]
+            n = order.size
+            cell.series[key] = np.empty(self.capacity, dtype=np.float64)
+            cell.series_seq[key] = np.empty(self.capacity, dtype=np.int64)
+            cell.series[key][:n] = values[order]
+            cell.series_seq[key][:n] = seqs[order]
+            cell.series_head[key] = n % self.capacity
+            cell.series_count[key] = n
+        return cell
+
+
 class MetricsRecorder:
     """
     Records and provides access to various operational metrics.
@@ -701,14 +1022,52 @@ class MetricsRecorder:
     durations, counts, and queue sizes within the vDriver system. It provides
     methods to update these metrics and retrieve them in raw or aggregated forms.
 
+    Durations and operation counters are sharded into one `_MetricsCell` per
+    recording thread, so the record path never takes a lock and never contends
+    with other threads. Cells are merged lazily when metrics are read. Each cell
+    keeps its most recent `_max_list_len` samples per series in NumPy ring
+    buffers. When a new thread registers, the cells of threads that have exited
+    are folded into one shared cell, so their counts remain part of the totals
+    without keeping a cell per dead thread. Reads never take the lock: the
+    queue-size dict and the cell list are replaced (copy-on-write) rather than
+    mutated, so readers only ever see complete containers. Reads taken while
+    other threads are recording are point-in-time approximations.
+
     Attributes:
-        metrics (dict): A dictionary holding all recorded metrics.
+        metrics (dict): A dictionary holding the gauge metrics (queue sizes and
+            the active request count).
         metrics_log_interval_sec (float): Interval for logging metrics by a monitor.
-        _lock (threading.Lock): A lock to ensure thread-safe updates to metrics.
-        _max_list_len (int): Maximum length for lists storing time-series data
-                             to prevent unbounded memory growth.
+        _lock (threading.Lock): A lock serializing queue-size writers and cell registration.
+        _max_list_len (int): Capacity of each per-thread time-series ring buffer,
+            and the most samples a series returns when read.
+        _cells (list[_MetricsCell]): The cells of live threads, followed by the
+            shared cell holding the data of exited threads.
     """
 
+    _SERIES_KEYS = (
+        "ttft_ms",
+        "prefill_op_ms",
+        "decode_op_ms",
+        "insert_op_ms",
+        "transfer_op_ms",
+        "operation_lock_wait_ms",
+    )
+    _COUNTER_KEYS = (
+        "prefill_ops_count",
+        "decode_ops_count",
+        "insert_ops_count",
+        "completed_requests_count",
+        "submitted_requests_count",
+    )
+    # Counter reported as `<series>_count_total`; series without one report their stored sample count
+    _SERIES_COUNTER_KEY: tp.ClassVar[tp.Mapping[str, str]] = MappingProxyType(
+        {
+            "prefill_op_ms": "prefill_ops_count",
+            "decode_op_ms": "decode_ops_count",
+            "insert_op_ms": "insert_ops_count",
+        }
+    )
+
     def __init__(self, metrics_log_interval_sec: float = 60.0):
         """
         Initializes the MetricsRecorder.
@@ -720,33 +1079,72 @@ class MetricsRecorder:
         self.metrics = {
             "queue_sizes": {},
             "active_requests_count": 0,
-            "ttft_ms": [],
-            "prefill_op_ms": [],
-            "decode_op_ms": [],
-            "insert_op_ms": [],
-            "transfer_op_ms": [],
-            "operation_lock_wait_ms": [],
-            "prefill_ops_count": 0,
-            "decode_ops_count": 0,
-            "insert_ops_count": 0,
-            "completed_requests_count": 0,
-            "submitted_requests_count": 0,
         }
         self._lock = threading.Lock()
         self.metrics_log_interval_sec = metrics_log_interval_sec
         self._max_list_len = 1000
+        self._local = threading.local()
+        self._cells: list[_MetricsCell] = [_MetricsCell(self._SERIES_KEYS, self._COUNTER_KEYS, self._max_list_len)]
+        self._sequence = itertools.count()
+        # Per series: ((window_size, samples written), (rounded stats, window count, stored count))
+        self._agg_cache: dict[str, tuple[tuple[int, int], tuple[list[float], int, int]]] = {}
+
+    def _cell(self) -> _MetricsCell:
+        """Returns the calling thread's cell, creating and registering it on first use."""
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = _MetricsCell(
+                self._SERIES_KEYS,
+                self._COUNTER_KEYS,
+                self._max_list_len,
+                owner=threading.current_thread(),
+            )
+            self._local.cell = cell
+            with self._lock:
+                *owned, retired = self._cells
+                exited = [c for c in owned if c.exited]
+                if exited:
+                    owned = [c for c in owned if not c.exited]
+                    retired = retired.merged(exited)
+                # Publish a new list instead of mutating the one lock-free readers may be copying
+                self._cells = [*owned, cell, retired]
+        return cell
 
     def _append_to_list(self, key: str, value: float):
         """
-        Appends a value to a list metric, ensuring it doesn't exceed max length.
+        Writes a value into the calling thread's ring buffer for a time-series metric.
 
         Args:
-            key (str): The key of the list metric in `self.metrics`.
+            key (str): The name of the time-series metric.
             value (float): The value to append.
         """
-        lst = self.metrics.get(key, [])
-        lst.append(value)
-        self.metrics[key] = lst[-self._max_list_len :]
+        self._cell().append(key, value, next(self._sequence))
+
+    def _series_values(self, cells: list[_MetricsCell], key: str, window_size: int = 0) -> np.ndarray:
+        """
+        Merges the most recent samples of a time-series metric across cells, oldest first.
+
+        Args:
+            cells (list[_MetricsCell]): The cells to merge.
+            key (str): The name of the time-series metric.
+            window_size (int): How many recent samples to return; 0 returns the
+                most recent `_max_list_len`, as larger windows do.
+
+        Returns:
+            np.ndarray: The selected samples in recording order.
+        """
+        limit = min(window_size, self._max_list_len) if window_size > 0 else self._max_list_len
+        parts = [cell.recent(key, limit) for cell in cells]
+        if not parts:
+            return np.empty(0, dtype=np.float64)
+        values = np.concatenate([part[0] for part in parts])
+        order = np.argsort(np.concatenate([part[1] for part in parts]), kind="stable")[-limit:]
+        return values[order]
+
+    def _snapshot(self) -> tuple[dict, list[_MetricsCell]]:
+        """Copies the gauge metrics and the list of registered cells without taking the lock."""
+        gauges = {k: dict(v) if isinstance(v, dict) else v for k, v in self.metrics.items()}
+        return gauges, list(self._cells)
 
     def update_queue_size(self, queue_name: str, size: int):
         """
@@ -757,7 +1155,8 @@ class MetricsRecorder:
             size (int): The current size of the queue.
         """
         with self._lock:
-            self.metrics["queue_sizes"][queue_name] = size
+            # Publish a new dict instead of mutating the one lock-free readers may be copying
+            self.metrics["queue_sizes"] = {**self.metrics["queue_sizes"], queue_name: size}
 
     def set_active_requests_count(self, count: int):
         """
@@ -766,8 +1165,7 @@ class MetricsRecorder:
         Args:
             count (int): The number of currently active requests.
         """
-        with self._lock:
-            self.metrics["active_requests_count"] = count
+        self.metrics["active_requests_count"] = count
 
     def record_ttft(self, ttft_ms: float):
         """
@@ -776,8 +1174,7 @@ class MetricsRecorder:
         Args:
             ttft_ms (float): The TTFT duration in milliseconds.
         """
-        with self._lock:
-            self._append_to_list("ttft_ms", ttft_ms)
+        self._append_to_list("ttft_ms", ttft_ms)
 
     def record_prefill_op_time(self, duration_ms: float):
         """
@@ -786,9 +1183,8 @@ class MetricsRecorder:
         Args:
             duration_ms (float): The prefill operation duration in milliseconds.
         """
-        with self._lock:
-            self._append_to_list("prefill_op_ms", duration_ms)
-            self.metrics["prefill_ops_count"] += 1
+        self._append_to_list("prefill_op_ms", duration_ms)
+        self._cell().counts["prefill_ops_count"] += 1
 
     def record_decode_op_time(self, duration_ms: float):
         """
@@ -797,9 +1193,8 @@ class MetricsRecorder:
         Args:
             duration_ms (float): The decode operation duration in milliseconds.
         """
-        with self._lock:
-            self._append_to_list("decode_op_ms", duration_ms)
-            self.metrics["decode_ops_count"] += 1
+        self._append_to_list("decode_op_ms", duration_ms)
+        self._cell().counts["decode_ops_count"] += 1
 
     def record_insert_op_time(self, duration_ms: float):
         """
@@ -808,9 +1203,8 @@ class MetricsRecorder:
         Args:
             duration_ms (float): The insert operation duration in milliseconds.
         """
-        with self._lock:
-            self._append_to_list("insert_op_ms", duration_ms)
-            self.metrics["insert_ops_count"] += 1
+        self._append_to_list("insert_op_ms", duration_ms)
+        self._cell().counts["insert_ops_count"] += 1
 
     def record_transfer_op_time(self, duration_ms: float):
         """
@@ -819,8 +1213,7 @@ class MetricsRecorder:
         Args:
             duration_ms (float): The transfer operation duration in milliseconds.
         """
-        with self._lock:
-            self._append_to_list("transfer_op_ms", duration_ms)
+        self._append_to_list("transfer_op_ms", duration_ms)
 
     def record_operation_lock_wait_time(self, duration_ms: float):
         """
@@ -829,18 +1222,15 @@ class MetricsRecorder:
         Args:
             duration_ms (float): The lock wait duration in milliseconds.
         """
-        with self._lock:
-            self._append_to_list("operation_lock_wait_ms", duration_ms)
+        self._append_to_list("operation_lock_wait_ms", duration_ms)
 
     def increment_completed_requests(self):
         """Increments the count of completed requests."""
-        with self._lock:
-            self.metrics["completed_requests_count"] += 1
+        self._cell().counts["completed_requests_count"] += 1
 
     def increment_submitted_requests(self):
         """Increments the count of submitted requests."""
-        with self._lock:
-            self.metrics["submitted_requests_count"] += 1
+        self._cell().counts["submitted_requests_count"] += 1
 
     def get_all_metrics(self) -> dict:
         """
@@ -849,16 +1239,12 @@ class MetricsRecorder:
         Returns:
             dict: A copy of the metrics dictionary.
         """
-        with self._lock:
-            copied_metrics = {}
-            for k, v in self.metrics.items():
-                if isinstance(v, list):
-                    copied_metrics[k] = list(v)
-                elif isinstance(v, dict):
-                    copied_metrics[k] = dict(v)
-                else:
-                    copied_metrics[k] = v
-            return copied_metrics
+        copied_metrics, cells = self._snapshot()
+        for key in self._SERIES_KEYS:
+            copied_metrics[key] = self._series_values(cells, key).tolist()
+        for key in self._COUNTER_KEYS:
+            copied_metrics[key] = sum(cell.counts[key] for cell in cells)
+        return copied_metrics
 
     def get_aggregated_metrics_snapshot(self, window_size=100) -> dict:
         """
@@ -866,7 +1252,8 @@ class MetricsRecorder:
 
         For list-based metrics (e.g., durations), it calculates average,
         percentiles (p50, p90, p99), min, and max over a specified window
-        of recent samples.
+        of recent samples. A series that has received no samples since the
+        previous call with the same `window_size` reuses its last statistics.
 
         Args:
             window_size (int): The number of recent samples to use for
@@ -875,24 +1262,35 @@ class MetricsRecorder:
         Returns:
             dict: A dictionary of aggregated metrics.
         """
-        snapshot = self.get_all_metrics()
-        aggregated = {}
-        for key, value in snapshot.items():
-            if isinstance(value, list) and value:
-                sample = value[-window_size:] if window_size > 0 else value
-                if sample:
-                    aggregated[f"{key}_avg"] = round(np.mean(sample), 2)
-                    aggregated[f"{key}_p50"] = round(np.percentile(sample, 50), 2)
-                    aggregated[f"{key}_p90"] = round(np.percentile(sample, 90), 2)
-                    aggregated[f"{key}_p99"] = round(np.percentile(sample, 99), 2)
-                    aggregated[f"{key}_min"] = round(np.min(sample), 2)
-                    aggregated[f"{key}_max"] = round(np.max(sample), 2)
-                    aggregated[f"{key}_count_total"] = snapshot.get(f"{key.split('_ms')[0]}_ops_count", len(value))
-                    aggregated[f"{key}_count_window"] = len(sample)
-            elif isinstance(value, dict):
-                aggregated[key] = dict(value)
-            elif isinstance(value, int | float):
-                aggregated[key] = value
+        aggregated, cells = self._snapshot()
+        for key in self._COUNTER_KEYS:
+            aggregated[key] = sum(cell.counts[key] for cell in cells)
+        for key in self._SERIES_KEYS:
+            # Taken before reading samples, so a sample landing mid-read only forces a recompute next time
+            signature = (window_size, sum(cell.series_written[key] for cell in cells))
+            cached = self._agg_cache.get(key)
+            if cached is not None and cached[0] == signature:
+                stats, window_count, stored = cached[1]
+            else:
+                sample = self._series_values(cells, key, window_size)
+                if not sample.size:
+                    continue
+                stored = min(sum(cell.series_count[key] for cell in cells), self._max_list_len)
+                window_count = int(sample.size)
+                # One partition for all three quantiles instead of one per np.percentile call
+                p50, p90, p99 = np.percentile(sample, (50, 90, 99))
+                stats = np.round(np.array([sample.mean(), p50, p90, p99, sample.min(), sample.max()]), 2).tolist()
+                self._agg_cache[key] = (signature, (stats, window_count, stored))
+            (
+                aggregated[f"{key}_avg"],
+                aggregated[f"{key}_p50"],
+                aggregated[f"{key}_p90"],
+                aggregated[f"{key}_p99"],
+                aggregated[f"{key}_min"],
+                aggregated[f"{key}_max"],
+            ) = stats
+            aggregated[f"{key}_count_total"] = aggregated.get(self._SERIES_COUNTER_KEY.get(key), stored)
+            aggregated[f"{key}_count_window"] = window_count
         return aggregated
 
 
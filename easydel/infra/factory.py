@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import importlib
 import inspect
 import typing as tp
 from enum import Enum
@@ -23,6 +24,17 @@ from .base_module import EasyDeLBaseConfig, EasyDeLBaseModule
 T = tp.TypeVar("T")
 
 
+def _import_model_modules() -> None:
+    """Imports every `easydel.modules` subpackage so all models are registered.
+
+    `easydel.modules` loads its subpackages lazily, so a registry lookup can
+    happen before the model it asks for has been imported.
+    """
+    modules = importlib.import_module("easydel.modules")
+    for name in modules.__all__:
+        importlib.import_module(f"easydel.modules.{name}")
+
+
 class ConfigType(str, Enum):
     """
     Enumeration defining types of configurations that can be registered.
@@ -211,6 +223,8 @@ class Registry:
         Raises:
             KeyError: If the `config_type` is not found in the specified `config_field` registry.
         """
+        if config_type not in self._config_registry[config_field]:
+            _import_model_modules()
         return self._config_registry[config_field][config_type]
 
     def get_module_registration(
@@ -242,6 +256,8 @@ class Registry:
         """
         task_in = self._task_registry.get(task_type, None)
         assert task_in is not None, f"task type {task_type} is not defined."
+        if model_type not in task_in:
+            _import_model_modules()
         type_in = task_in.get(model_type, None)
         assert type_in is not None, f"model type {model_type} is not defined. (upper task {task_type})"
 
@@ -249,12 +265,14 @@ class Registry:
 
     @property
     def task_registry(self):
-        """Provides access to the underlying task registry dictionary."""
+        """Provides access to the underlying task registry dictionary, with every model registered."""
+        _import_model_modules()
         return self._task_registry
 
     @property
     def config_registry(self):
-        """Provides access to the underlying configuration registry dictionary."""
+        """Provides access to the underlying configuration registry dictionary, with every model registered."""
+        _import_model_modules()
         return self._config_registry
 
 
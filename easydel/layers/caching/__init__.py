@@ -57,12 +57,16 @@ Note:
     cache based on your model's requirements.
 """
 
-from ._specs import ChunkedLocalAttentionSpec, FullAttentionSpec, KVCacheSpec, MambaSpec, SlidingWindowSpec
-from .lightning import LightningCache, LightningCacheMetaData, LightningCacheView, LightningMetadata
-from .mamba import MambaCache, MambaCacheMetaData, MambaCacheView, MambaMetadata
-from .mamba2 import Mamba2Cache, Mamba2CacheMetaData, Mamba2CacheView, Mamba2Metadata
-from .page import PagesCache, PagesCacheMetaData, PagesCacheView, PagesMetadata
-from .transformer import TransformerCache, TransformerCacheMetaData, TransformerCacheView, TransformerMetadata
+import importlib as _importlib
+import typing as _tp
+
+if _tp.TYPE_CHECKING:
+    from ._specs import ChunkedLocalAttentionSpec, FullAttentionSpec, KVCacheSpec, MambaSpec, SlidingWindowSpec
+    from .lightning import LightningCache, LightningCacheMetaData, LightningCacheView, LightningMetadata
+    from .mamba import MambaCache, MambaCacheMetaData, MambaCacheView, MambaMetadata
+    from .mamba2 import Mamba2Cache, Mamba2CacheMetaData, Mamba2CacheView, Mamba2Metadata
+    from .page import PagesCache, PagesCacheMetaData, PagesCacheView, PagesMetadata
+    from .transformer import TransformerCache, TransformerCacheMetaData, TransformerCacheView, TransformerMetadata
 
 __all__ = (
     "ChunkedLocalAttentionSpec",
@@ -91,3 +95,45 @@ __all__ = (
     "TransformerCacheView",
     "TransformerMetadata",
 )
+
+# Submodule holding each public name; backends are only imported when one of their names is first used (PEP 562).
+_REDIRECT = {
+    "ChunkedLocalAttentionSpec": "_specs",
+    "FullAttentionSpec": "_specs",
+    "KVCacheSpec": "_specs",
+    "MambaSpec": "_specs",
+    "SlidingWindowSpec": "_specs",
+    "LightningCache": "lightning",
+    "LightningCacheMetaData": "lightning",
+    "LightningCacheView": "lightning",
+    "LightningMetadata": "lightning",
+    "MambaCache": "mamba",
+    "MambaCacheMetaData": "mamba",
+    "MambaCacheView": "mamba",
+    "MambaMetadata": "mamba",
+    "Mamba2Cache": "mamba2",
+    "Mamba2CacheMetaData": "mamba2",
+    "Mamba2CacheView": "mamba2",
+    "Mamba2Metadata": "mamba2",
+    "PagesCache": "page",
+    "PagesCacheMetaData": "page",
+    "PagesCacheView": "page",
+    "PagesMetadata": "page",
+    "TransformerCache": "transformer",
+    "TransformerCacheMetaData": "transformer",
+    "TransformerCacheView": "transformer",
+    "TransformerMetadata": "transformer",
+}
+
+
+def __getattr__(name: str):
+    module_name = _REDIRECT.get(name)
+    if module_name is not None:
+        value = getattr(_importlib.import_module(f".{module_name}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(__all__) | set(globals()))
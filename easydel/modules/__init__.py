@@ -1,59 +1,12 @@
-from . import (
-    arctic,
-    auto,
-    aya_vision,
-    clip,
-    cohere,
-    cohere2,
-    dbrx,
-    deepseek_v2,
-    deepseek_v3,
-    exaone,
-    falcon,
-    gemma,
-    gemma2,
-    gemma3,
-    gidd,
-    glm,
-    glm4,
-    glm4_moe,
-    gpt2,
-    gpt_j,
-    gpt_neox,
-    gpt_oss,
-    grok_1,
-    internlm2,
-    llama,
-    llama4,
-    llava,
-    mamba,
-    mamba2,
-    minimax_text_v1,
-    mistral,
-    mistral3,
-    mixtral,
-    mosaic_mpt,
-    olmo,
-    olmo2,
-    openelm,
-    opt,
-    phi,
-    phi3,
-    phimoe,
-    pixtral,
-    qwen2,
-    qwen2_moe,
-    qwen2_vl,
-    qwen3,
-    qwen3_moe,
-    roberta,
-    rwkv,
-    siglip,
-    stablelm,
-    whisper,
-    xerxes,
-    xerxes2,
-)
+"""EasyDeL model implementations.
+
+Model subpackages are imported lazily (PEP 562) on first attribute access, so
+importing one model does not pull in every other one. Each subpackage registers
+its configs and modules with `easydel.infra.factory.registry` on import; the
+registry imports all subpackages itself when a lookup misses.
+"""
+
+import importlib as _importlib
 
 __all__ = (
     "arctic",
@@ -111,3 +64,17 @@ __all__ = (
     "xerxes",
     "xerxes2",
 )
+
+_LAZY_MODULES = frozenset(__all__)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(_LAZY_MODULES | set(globals()))
@@ -0,0 +1,38 @@
+"""Checks for the chunked device-to-host copy of vSurge ResultTokens."""
+
+import jax.numpy as jnp
+import numpy as np
+
+from easydel.inference.vsurge.utils import ResultTokens
+
+
+def _make_result_tokens(rows: int) -> ResultTokens:
+    data = jnp.arange(rows * 3, dtype=jnp.int32).reshape(rows, 3)
+    return ResultTokens(data=data, tokens_idx=(0, 1), valid_idx=(1, 2), length_idx=(2, 3), samples_per_slot=1)
+
+
+def test_copy_to_host_chunked_matches_device_data():
+    """Every slab lands in its own rows, including uneven splits."""
+    for rows, num_threads in ((8, 4), (10, 3), (5, 5)):
+        result = _make_result_tokens(rows)
+        copied = result.copy_to_host_chunked(num_threads=num_threads)
+        assert isinstance(copied.data, np.ndarray)
+        np.testing.assert_array_equal(copied.data, np.asarray(result.data))
+        assert copied.tokens_idx == result.tokens_idx
+        assert copied.samples_per_slot == result.samples_per_slot
+
+
+def test_copy_to_host_chunked_reuses_pool():
+    """Repeated copies with the same thread count keep working on the shared pool."""
+    result = _make_result_tokens(8)
+    for _ in range(3):
+        np.testing.assert_array_equal(result.copy_to_host_chunked(num_threads=2).data, np.asarray(result.data))
+
+
+def test_copy_to_host_chunked_falls_back():
+    """A single thread, fewer rows than threads, or host data use convert_to_numpy()."""
+    result = _make_result_tokens(2)
+    np.testing.assert_array_equal(result.copy_to_host_chunked(num_threads=1).data, np.asarray(result.data))
+    np.testing.assert_array_equal(result.copy_to_host_chunked(num_threads=4).data, np.asarray(result.data))
+    host = result.convert_to_numpy()
+    assert host.copy_to_host_chunked(num_threads=2) is host
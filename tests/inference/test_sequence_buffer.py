@@ -0,0 +1,246 @@
+"""Randomized invariant checks for the eSurge SequenceBuffer bookkeeping."""
+
+import random
+
+import jax
+import numpy as np
+import pytest
+
+from easydel.inference.esurge.runners.sequence_buffer import SequenceBuffer
+from easydel.inference.esurge.runners.states import CachedRequestState
+from easydel.inference.sampling_params import SamplingParams
+
+MAX_NUM_REQS = 8
+MAX_MODEL_LEN = 64
+PAGE_SIZE = 16
+VOCAB_SIZE = 128
+
+
+def _make_buffer() -> SequenceBuffer:
+    return SequenceBuffer.create(
+        max_num_reqs=MAX_NUM_REQS,
+        max_model_len=MAX_MODEL_LEN,
+        max_num_batched_tokens=MAX_MODEL_LEN,
+        vocab_size=VOCAB_SIZE,
+        page_sizes=[PAGE_SIZE],
+    )
+
+
+def _make_request(rng: random.Random, req_id: str) -> CachedRequestState:
+    # Penalties are set on roughly half of the requests so reused slots see both directions
+    penalized = rng.random() < 0.5
+    sampling_params = SamplingParams(
+        temperature=rng.choice([0.0, 0.7, 1.0]),
+        top_p=rng.choice([1.0, 0.9]),
+        top_k=rng.choice([0, 5, VOCAB_SIZE + 1]),
+        min_p=rng.choice([0.0, 0.1]),
+        frequency_penalty=rng.choice([0.5, -0.5]) if penalized else 0.0,
+        presence_penalty=rng.choice([0.0, 1.0]) if penalized else 0.0,
+        repetition_penalty=rng.choice([1.0, 1.2]) if penalized else 1.0,
+        min_tokens=rng.choice([0, 0, 2]),
+        logit_bias={rng.randrange(VOCAB_SIZE): 1.5} if rng.random() < 0.3 else None,
+    )
+    prompt = [rng.randrange(VOCAB_SIZE) for _ in range(rng.randint(1, 24))]
+    outputs = [rng.randrange(VOCAB_SIZE) for _ in range(rng.randint(0, 8))]
+    num_tokens = len(prompt) + len(outputs)
+    num_pages = -(-num_tokens // PAGE_SIZE)
+    return CachedRequestState(
+        req_id=req_id,
+        prompt_token_ids=prompt,
+        sampling_params=sampling_params,
+        generator=jax.random.PRNGKey(0),
+        page_ids=([rng.randrange(1000) for _ in range(num_pages)],),
+        num_computed_tokens=rng.randint(0, num_tokens),
+        output_token_ids=outputs,
+    )
+
+
+def _check_buffer(buf: SequenceBuffer, oracle: dict[str, CachedRequestState]) -> None:
+    """Compares every live slot of ``buf`` against the request it should hold."""
+    assert buf.num_reqs == len(oracle)
+    assert set(buf.req_id_to_index) == set(oracle)
+    assert sum(req_id is not None for req_id in buf.req_ids) == len(oracle)
+
+    token_ids = np.asarray(buf.token_ids)
+    num_tokens = np.asarray(buf.num_tokens)
+    num_prompt_tokens = np.asarray(buf.num_prompt_tokens)
+    num_computed_tokens = np.asarray(buf.num_computed_tokens)
+    temperature = np.asarray(buf.temperature)
+    top_p = np.asarray(buf.top_p)
+    top_k = np.asarray(buf.top_k)
+    min_p = np.asarray(buf.min_p)
+    frequency_penalties = np.asarray(buf.frequency_penalties)
+    presence_penalties = np.asarray(buf.presence_penalties)
+    repetition_penalties = np.asarray(buf.repetition_penalties)
+    page_table = buf.page_table.page_tables[0]
+    pages = np.asarray(page_table.page_table)
+    num_pages = np.asarray(page_table.num_pages_per_row)
+
+    penalized_slots = set()
+    for req_id, request in oracle.items():
+        idx = buf.req_id_to_index[req_id]
+        params = request.sampling_params
+        assert buf.req_ids[idx] == req_id
+        assert buf.req_output_token_ids[idx] is request.output_token_ids
+
+        tokens = request.prompt_token_ids + request.output_token_ids
+        np.testing.assert_array_equal(token_ids[idx, : len(tokens)], tokens)
+        assert num_tokens[idx] == request.num_tokens
+        assert num_prompt_tokens[idx] == len(request.prompt_token_ids)
+        assert num_computed_tokens[idx] == request.num_computed_tokens
+
+        greedy = params.temperature == 0.0
+        np.testing.assert_allclose(temperature[idx], -1.0 if greedy else params.temperature)
+        np.testing.assert_allclose(top_p[idx], params.top_p)
+        assert top_k[idx] == (params.top_k if 0 < params.top_k < VOCAB_SIZE else VOCAB_SIZE)
+        np.testing.assert_allclose(min_p[idx], params.min_p)
+        np.testing.assert_allclose(frequency_penalties[idx], params.frequency_penalty)
+        np.testing.assert_allclose(presence_penalties[idx], params.presence_penalty)
+        np.testing.assert_allclose(repetition_penalties[idx], params.repetition_penalty)
+        if params.frequency_penalty != 0.0 or params.presence_penalty != 0.0 or params.repetition_penalty != 1.0:
+            penalized_slots.add(idx)
+
+        (page_ids,) = request.page_ids
+        assert num_pages[idx] == len(page_ids)
+        np.testing.assert_array_equal(pages[idx, : len(page_ids)], page_ids)
+
+        assert (idx in buf.min_tokens) == bool(params.min_tokens)
+        assert (idx in buf.logit_bias) == (params.logit_bias is not None)
+        if params.logit_bias is not None:
+            token_ids_bias, biases = buf.logit_bias[idx]
+            np.testing.assert_array_equal(token_ids_bias, list(params.logit_bias))
+            np.testing.assert_allclose(biases, list(params.logit_bias.values()))
+
+    assert set(np.asarray(buf.get_request_indices_with_penalty()).tolist()) == penalized_slots
+    assert buf.no_penalties == (not penalized_slots)
+    assert len(buf.min_tokens) == sum(bool(r.sampling_params.min_tokens) for r in oracle.values())
+    assert len(buf.logit_bias) == sum(r.sampling_params.logit_bias is not None for r in oracle.values())
+
+
+def test_sequence_buffer_random_operations():
+    """Random add/remove/reuse/swap/condense sequences keep every slot consistent with its request."""
+    rng = random.Random(0)
+    buf = _make_buffer()
+    oracle: dict[str, CachedRequestState] = {}
+    holes: list[int] = []
+    next_id = 0
+
+    for _ in range(150):
+        op = rng.choice(["add", "add_batch", "remove", "swap", "condense"])
+        free = MAX_NUM_REQS - len(oracle)
+
+        if op in ("add", "add_batch") and free > 0:
+            count = 1 if op == "add" else rng.randint(1, free)
+            requests = []
+            for _ in range(count):
+                requests.append(_make_request(rng, f"req-{next_id}"))
+                next_id += 1
+            # Reuse freed slots first, as the model runner does
+            holes.sort(reverse=True)
+            indices = [holes.pop() if holes else None for _ in requests]
+            if op == "add":
+                buf = buf.add_request(requests[0], indices[0])
+            else:
+                buf = buf.add_requests(requests, indices)
+            for request, index in zip(requests, indices, strict=True):
+                oracle[request.req_id] = request
+                if index is not None:
+                    assert buf.req_id_to_index[request.req_id] == index
+        elif op == "remove" and oracle:
+            req_id = rng.choice(sorted(oracle))
+            buf, removed = buf.remove_request(req_id)
+            assert removed is not None
+            holes.append(removed)
+            del oracle[req_id]
+        elif op == "swap" and not holes and len(oracle) >= 2:
+            i1, i2 = rng.sample(range(buf.num_reqs), 2)
+            id1, id2 = buf.req_ids[i1], buf.req_ids[i2]
+            buf = buf.swap_states(i1, i2)
+            assert buf.req_id_to_index[id1] == i2
+            assert buf.req_id_to_index[id2] == i1
+        elif op == "condense":
+            buf = buf.condense(sorted(holes, reverse=True))
+            holes = []
+            assert sorted(buf.req_id_to_index.values()) == list(range(buf.num_reqs))
+
+        _check_buffer(buf, oracle)
+
+
+def test_sequence_buffer_reused_slot_resets_penalties():
+    """A request placed in a freed slot does not inherit the previous occupant's penalties."""
+    rng = random.Random(1)
+    buf = _make_buffer()
+    penalized = _make_request(rng, "penalized")
+    penalized.sampling_params.frequency_penalty = 1.0
+    penalized.sampling_params.presence_penalty = 1.0
+    penalized.sampling_params.repetition_penalty = 1.3
+    buf = buf.add_request(penalized)
+    buf, index = buf.remove_request("penalized")
+
+    plain = _make_request(rng, "plain")
+    plain.sampling_params.frequency_penalty = 0.0
+    plain.sampling_params.presence_penalty = 0.0
+    plain.sampling_params.repetition_penalty = 1.0
+    buf = buf.add_request(plain, index)
+
+    assert buf.req_id_to_index["plain"] == index
+    assert float(buf.frequency_penalties[index]) == 0.0
+    assert float(buf.presence_penalties[index]) == 0.0
+    assert float(buf.repetition_penalties[index]) == 1.0
+    assert buf.no_penalties
+    _check_buffer(buf, {"plain": plain})
+
+
+def _host_state(buf: SequenceBuffer) -> tuple:
+    return (
+        list(buf.req_ids),
+        dict(buf.req_id_to_index),
+        list(buf.req_output_token_ids),
+        buf._flags.copy(),
+        buf._slot_live.copy(),
+        buf._prompt_lens.copy(),
+        buf.num_reqs,
+        buf._dirty_upto,
+        dict(buf.min_tokens),
+        dict(buf.logit_bias),
+    )
+
+
+def _assert_same_host_state(before: tuple, after: tuple) -> None:
+    for expected, actual in zip(before, after, strict=True):
+        if isinstance(expected, np.ndarray):
+            np.testing.assert_array_equal(actual, expected)
+        else:
+            assert actual == expected
+
+
+def test_sequence_buffer_rejected_batch_leaves_buffer_unchanged():
+    """add_requests validates the whole batch before registering any request."""
+    rng = random.Random(2)
+    buf = _make_buffer()
+    kept = _make_request(rng, "b")
+    buf = buf.add_requests([_make_request(rng, "a"), kept])
+    buf, removed = buf.remove_request("a")
+    before = _host_state(buf)
+
+    rejected_batches = [
+        # Repeated within the batch
+        ([_make_request(rng, "c"), _make_request(rng, "d"), _make_request(rng, "c")], None, ValueError),
+        # Already in the buffer
+        ([_make_request(rng, "c"), _make_request(rng, "b")], None, ValueError),
+        # Out-of-range and occupied explicit indices
+        ([_make_request(rng, "c"), _make_request(rng, "d")], [None, MAX_NUM_REQS], IndexError),
+        ([_make_request(rng, "c"), _make_request(rng, "d")], [removed, removed], ValueError),
+        # More requests than free slots
+        ([_make_request(rng, f"new-{i}") for i in range(MAX_NUM_REQS)], None, RuntimeError),
+    ]
+    for requests, indices, error in rejected_batches:
+        with pytest.raises(error):
+            buf.add_requests(requests, indices)
+        _assert_same_host_state(before, _host_state(buf))
+
+    _check_buffer(buf, {"b": kept})
+    added = _make_request(rng, "c")
+    buf = buf.add_requests([added], [removed])
+    assert buf.req_id_to_index["c"] == removed
+    _check_buffer(buf, {"b": kept, "c": added})